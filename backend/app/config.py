@@ -18,9 +18,13 @@ class Settings(BaseSettings):
     jira_user: Optional[str] = None
     jira_password: Optional[str] = None
 
+    # Extraction: parallel ticket fetches per job (I/O-bound, threads mostly wait on Jira)
+    extraction_threads: int = 16
+
     # API
     api_prefix: str = "/api"
-    cors_origins: list[str] = ["http://localhost:3008", "http://localhost:5178"]
+    # Cross-origin dev servers only (see .env.example); empty = no CORS middleware
+    cors_origins: list[str] = []
 
     # Database
     database_path: str = "data/correlator.db"
@@ -38,6 +42,9 @@ class Settings(BaseSettings):
     # Ranking defaults
     default_top_results: int = 20
 
+    # Debug: allow ?profile=1 on any request (requires pyinstrument)
+    enable_profiling: bool = False
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -3,38 +3,193 @@ SQLite storage for jobs and analysis results.
 """
 
 import sqlite3
-import json
+import hashlib
+import logging
+import zlib
 import uuid
+import threading
+import time
+from queue import Queue, Empty, Full
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Type
 from contextlib import contextmanager
+from functools import lru_cache
+
+import orjson
+
+from pydantic import BaseModel
 
 from ..models import JobStatus, JobInfo, Weights, Penalties, Bonuses, Thresholds
 
+logger = logging.getLogger(__name__)
+
+
+# Per-connection pragmas (SQLite does not persist these in the database file).
+# busy_timeout makes concurrent writers wait instead of failing with "database is locked".
+# foreign_keys is required for ON DELETE CASCADE.
+CONNECTION_PRAGMAS = (
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA wal_autocheckpoint=1000",
+)
+
+# Number of pooled read connections kept open
+POOL_SIZE = 8
+
+# Prepared statements cached per connection (sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+# zlib level for extraction payloads (large, written once, read whole)
+EXTRACTION_COMPRESSION_LEVEL = 6
+# Seconds a config value read from the DB is served from memory
+CONFIG_CACHE_TTL = 30.0
+_MISSING = object()
+
+# Column order used by _job_from_row
+JOB_COLUMNS = (
+    "job_id, inc, window, status, progress, total_teccms, error, "
+    "created_at, completed_at, job_type, username, search_summary"
+)
+
+
+def _dumps(value: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes (non-str dict keys are coerced, like json.dumps)."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _dumps_sorted(value: Any) -> bytes:
+    """_dumps with sorted keys (stable output for hashing)."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS)
+
+
+# Serialized default weights, reused by save_ranking for jobs scored with defaults
+_DEFAULT_WEIGHTS_JSON = _dumps(Weights().model_dump()).decode()
+
+
+@lru_cache(maxsize=1024)
+def _parse_ts(value: str) -> datetime:
+    """
+    Parse a stored "...Z" UTC timestamp into a naive datetime.
+
+    Cached because job lists re-parse the same timestamps on every poll
+    (datetime objects are immutable, so sharing them is safe).
+    """
+    if value.endswith("Z"):
+        value = value[:-1]
+    return datetime.fromisoformat(value)
+
+
+def _job_from_row(row) -> JobInfo:
+    """Build a JobInfo from a row selected with JOB_COLUMNS."""
+    (job_id, inc, window, status, progress, total_teccms, error,
+     created_at, completed_at, job_type, username, search_summary) = row
+
+    return JobInfo(
+        job_id=job_id,
+        inc=inc,
+        window=window,
+        status=JobStatus(status),
+        progress=progress or 0,
+        total_teccms=total_teccms,
+        error=error,
+        created_at=_parse_ts(created_at),
+        completed_at=_parse_ts(completed_at) if completed_at else None,
+        job_type=job_type,
+        username=username,
+        search_summary=search_summary,
+    )
+
 
 class Database:
     """SQLite database manager."""
 
     def __init__(self, db_path: str = "data/correlator.db"):
+        self.in_memory = db_path == ":memory:"
         self.db_path = Path(db_path)
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.in_memory:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Single writer connection serialized by a lock; readers come from the pool.
+        # An in-memory database only exists within one connection, so it uses the writer for everything.
+        self._write_lock = threading.Lock()
+        self._writer = self._new_connection()
+        self._pool: Queue = Queue(maxsize=POOL_SIZE)
+        self._config_cache: Dict[str, Tuple[float, Any]] = {}
+        # Bumped on every config write (used for ETags on the config endpoints)
+        self.config_version = 0
+
         self._init_db()
 
-    @contextmanager
-    def _get_connection(self):
-        """Context manager for database connections."""
-        conn = sqlite3.connect(str(self.db_path))
+        if not self.in_memory:
+            for _ in range(POOL_SIZE):
+                self._pool.put_nowait(self._new_connection())
+
+    def _new_connection(self) -> sqlite3.Connection:
+        """Open a new connection with the standard pragmas applied."""
+        # Connections are shared with the job executor threads
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
         conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def _get_connection(self, write: bool = False):
+        """
+        Context manager for database connections.
+
+        Writes use the dedicated writer connection and are committed (or rolled
+        back on error) on exit. Reads borrow a connection from the pool.
+        """
+        if write or self.in_memory:
+            with self._write_lock:
+                try:
+                    yield self._writer
+                    self._writer.commit()
+                except Exception:
+                    self._writer.rollback()
+                    raise
+            return
+
+        try:
+            conn = self._pool.get_nowait()
+        except Empty:
+            conn = self._new_connection()
         try:
             yield conn
-            conn.commit()
         finally:
-            conn.close()
+            try:
+                self._pool.put_nowait(conn)
+            except Full:
+                conn.close()
+
+    def close(self):
+        """Close all open connections."""
+        with self._write_lock:
+            self._writer.close()
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except Empty:
+                break
 
     def _init_db(self):
         """Initialize database schema."""
-        with self._get_connection() as conn:
+        with self._get_connection(write=True) as conn:
+            # WAL lets readers run concurrently with the job writers and avoids
+            # creating/deleting a rollback journal on every commit.
+            # journal_mode is persistent, so it only needs to be set once.
+            # Not applicable to in-memory databases.
+            if not self.in_memory:
+                mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+                if mode.lower() != "wal":
+                    logger.warning(f"Could not enable WAL journal mode (using {mode})")
+
             conn.executescript("""
                 -- Jobs table
                 CREATE TABLE IF NOT EXISTS jobs (
@@ -52,11 +207,12 @@ class Database:
                     search_summary TEXT
                 );
 
-                -- Extraction data (JSON blob)
+                -- Extraction data (JSON, compressed as indicated by `compression`)
                 CREATE TABLE IF NOT EXISTS extractions (
                     job_id TEXT PRIMARY KEY,
                     data TEXT NOT NULL,
-                    FOREIGN KEY (job_id) REFERENCES jobs(job_id)
+                    compression TEXT,
+                    FOREIGN KEY (job_id) REFERENCES jobs(job_id) ON DELETE CASCADE
                 );
 
                 -- Ranking results (JSON blob)
@@ -66,7 +222,8 @@ class Database:
                     weights TEXT NOT NULL,
                     data TEXT NOT NULL,
                     created_at TEXT NOT NULL,
-                    FOREIGN KEY (job_id) REFERENCES jobs(job_id)
+                    scoring_config TEXT,
+                    FOREIGN KEY (job_id) REFERENCES jobs(job_id) ON DELETE CASCADE
                 );
 
                 -- Config table
@@ -94,6 +251,47 @@ class Database:
                 conn.execute("ALTER TABLE jobs ADD COLUMN search_summary TEXT")
             except:
                 pass
+            try:
+                # NULL means uncompressed JSON text (rows saved before compression)
+                conn.execute("ALTER TABLE extractions ADD COLUMN compression TEXT")
+            except:
+                pass
+            try:
+                # NULL: ranking saved before the scoring config was tracked (never reused)
+                conn.execute("ALTER TABLE rankings ADD COLUMN scoring_config TEXT")
+            except:
+                pass
+
+            # Migration: recreate child tables created before ON DELETE CASCADE
+            for table in ("extractions", "rankings"):
+                self._migrate_cascade(conn, table)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_rankings_job ON rankings(job_id)")
+
+            # Covering job-list index from earlier versions: it duplicated most of the
+            # table and was rewritten on every progress update; idx_jobs_created is enough
+            conn.execute("DROP INDEX IF EXISTS idx_jobs_list")
+
+    def _migrate_cascade(self, conn: sqlite3.Connection, table: str):
+        """Rebuild a child table so its job_id foreign key cascades on delete."""
+        fks = conn.execute(f"PRAGMA foreign_key_list({table})").fetchall()
+        if all(fk["on_delete"] == "CASCADE" for fk in fks):
+            return
+
+        logger.info(f"Migrating table {table} to ON DELETE CASCADE")
+        sql = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()["sql"]
+        sql = sql.replace(f"CREATE TABLE {table}", f"CREATE TABLE {table}_new", 1)
+        sql = sql.replace("REFERENCES jobs(job_id)", "REFERENCES jobs(job_id) ON DELETE CASCADE")
+
+        conn.execute(sql)
+        # Orphaned rows would violate the now-enforced foreign key
+        conn.execute(
+            f"INSERT INTO {table}_new SELECT * FROM {table} "
+            f"WHERE job_id IN (SELECT job_id FROM jobs)"
+        )
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
 
     # ══════════════════════════════════════════════════════════════════════════
     #  JOBS
@@ -111,7 +309,7 @@ class Database:
         job_id = str(uuid.uuid4())
         now = datetime.utcnow().isoformat() + "Z"
 
-        with self._get_connection() as conn:
+        with self._get_connection(write=True) as conn:
             conn.execute(
                 """INSERT INTO jobs (job_id, inc, window, status, created_at, job_type, username, search_summary)
                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
@@ -124,51 +322,22 @@ class Database:
         """Get job info by ID."""
         with self._get_connection() as conn:
             row = conn.execute(
-                "SELECT * FROM jobs WHERE job_id = ?", (job_id,)
+                f"SELECT {JOB_COLUMNS} FROM jobs WHERE job_id = ?", (job_id,)
             ).fetchone()
 
             if not row:
                 return None
 
-            return JobInfo(
-                job_id=row["job_id"],
-                inc=row["inc"],
-                window=row["window"],
-                status=JobStatus(row["status"]),
-                progress=row["progress"] or 0,
-                total_teccms=row["total_teccms"],
-                error=row["error"],
-                created_at=datetime.fromisoformat(row["created_at"].replace("Z", "")),
-                completed_at=datetime.fromisoformat(row["completed_at"].replace("Z", "")) if row["completed_at"] else None,
-                job_type=row["job_type"] if "job_type" in row.keys() else "standard",
-                username=row["username"] if "username" in row.keys() else None,
-                search_summary=row["search_summary"] if "search_summary" in row.keys() else None,
-            )
+            return _job_from_row(row)
 
     def get_jobs(self, limit: int = 50) -> List[JobInfo]:
         """Get recent jobs."""
         with self._get_connection() as conn:
             rows = conn.execute(
-                "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+                f"SELECT {JOB_COLUMNS} FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
             ).fetchall()
 
-            return [
-                JobInfo(
-                    job_id=row["job_id"],
-                    inc=row["inc"],
-                    window=row["window"],
-                    status=JobStatus(row["status"]),
-                    progress=row["progress"] or 0,
-                    total_teccms=row["total_teccms"],
-                    error=row["error"],
-                    created_at=datetime.fromisoformat(row["created_at"].replace("Z", "")),
-                    completed_at=datetime.fromisoformat(row["completed_at"].replace("Z", "")) if row["completed_at"] else None,
-                    job_type=row["job_type"] if "job_type" in row.keys() else "standard",
-                    username=row["username"] if "username" in row.keys() else None,
-                    search_summary=row["search_summary"] if "search_summary" in row.keys() else None,
-                )
-                for row in rows
-            ]
+            return [_job_from_row(row) for row in rows]
 
     def update_job_status(
         self,
@@ -178,39 +347,29 @@ class Database:
         total_teccms: int = None,
         error: str = None
     ):
-        """Update job status and progress."""
-        with self._get_connection() as conn:
-            updates = ["status = ?"]
-            params = [status.value]
-
-            if progress is not None:
-                updates.append("progress = ?")
-                params.append(progress)
-
-            if total_teccms is not None:
-                updates.append("total_teccms = ?")
-                params.append(total_teccms)
-
-            if error is not None:
-                updates.append("error = ?")
-                params.append(error)
-
-            if status in (JobStatus.COMPLETED, JobStatus.FAILED):
-                updates.append("completed_at = ?")
-                params.append(datetime.utcnow().isoformat() + "Z")
-
-            params.append(job_id)
-
+        """Update job status and progress (fields left as None keep their current value)."""
+        completed_at = None
+        if status in (JobStatus.COMPLETED, JobStatus.FAILED):
+            completed_at = datetime.utcnow().isoformat() + "Z"
+
+        # One fixed statement for every combination of fields, so it is always
+        # served from the connection's prepared statement cache
+        with self._get_connection(write=True) as conn:
             conn.execute(
-                f"UPDATE jobs SET {', '.join(updates)} WHERE job_id = ?",
-                params
+                """UPDATE jobs SET
+                       status = ?,
+                       progress = COALESCE(?, progress),
+                       total_teccms = COALESCE(?, total_teccms),
+                       error = COALESCE(?, error),
+                       completed_at = COALESCE(?, completed_at)
+                   WHERE job_id = ?""",
+                (status.value, progress, total_teccms, error, completed_at, job_id)
             )
 
     def delete_job(self, job_id: str) -> bool:
         """Delete a job and its related data."""
-        with self._get_connection() as conn:
-            conn.execute("DELETE FROM rankings WHERE job_id = ?", (job_id,))
-            conn.execute("DELETE FROM extractions WHERE job_id = ?", (job_id,))
+        # Extractions and rankings are removed by ON DELETE CASCADE
+        with self._get_connection(write=True) as conn:
             result = conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
             return result.rowcount > 0
 
@@ -219,40 +378,64 @@ class Database:
     # ══════════════════════════════════════════════════════════════════════════
 
     def save_extraction(self, job_id: str, data: Dict[str, Any]):
-        """Save extraction data."""
-        with self._get_connection() as conn:
+        """Save extraction data (zlib-compressed JSON)."""
+        payload = zlib.compress(_dumps(data), EXTRACTION_COMPRESSION_LEVEL)
+
+        with self._get_connection(write=True) as conn:
             conn.execute(
-                """INSERT OR REPLACE INTO extractions (job_id, data)
-                   VALUES (?, ?)""",
-                (job_id, json.dumps(data, ensure_ascii=False))
+                """INSERT OR REPLACE INTO extractions (job_id, data, compression)
+                   VALUES (?, ?, ?)""",
+                (job_id, payload, "zlib")
             )
 
     def get_extraction(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get extraction data."""
         with self._get_connection() as conn:
             row = conn.execute(
-                "SELECT data FROM extractions WHERE job_id = ?", (job_id,)
+                "SELECT data, compression FROM extractions WHERE job_id = ?", (job_id,)
             ).fetchone()
 
             if not row:
                 return None
 
-            return json.loads(row["data"])
+            return self._load_extraction(row)
+
+    @staticmethod
+    def _load_extraction(row: sqlite3.Row) -> Dict[str, Any]:
+        """Decode a stored extraction (data, compression) row."""
+        data = row["data"]
+        if row["compression"] == "zlib":
+            data = zlib.decompress(data)
+        return orjson.loads(data)
 
     # ══════════════════════════════════════════════════════════════════════════
     #  RANKINGS
     # ══════════════════════════════════════════════════════════════════════════
 
-    def save_ranking(self, job_id: str, weights: Weights, data: Dict[str, Any]):
-        """Save ranking result."""
+    def save_ranking(
+        self,
+        job_id: str,
+        weights: Optional[Weights],
+        data: Dict[str, Any],
+        scoring_config: Optional[str] = None
+    ):
+        """
+        Save ranking result (weights=None means the default Weights()). Returns the ranking id.
+        scoring_config is the get_scoring_config_digest() the ranking was computed with
+        (defaults to the current one).
+        """
         now = datetime.utcnow().isoformat() + "Z"
-
-        with self._get_connection() as conn:
-            conn.execute(
-                """INSERT INTO rankings (job_id, weights, data, created_at)
-                   VALUES (?, ?, ?, ?)""",
-                (job_id, json.dumps(weights.model_dump()), json.dumps(data, ensure_ascii=False), now)
+        weights_json = _DEFAULT_WEIGHTS_JSON if weights is None else _dumps(weights.model_dump()).decode()
+        if scoring_config is None:
+            scoring_config = self.get_scoring_config_digest()
+
+        with self._get_connection(write=True) as conn:
+            cursor = conn.execute(
+                """INSERT INTO rankings (job_id, weights, data, created_at, scoring_config)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (job_id, weights_json, _dumps(data).decode(), now, scoring_config)
             )
+            return cursor.lastrowid
 
     def get_latest_ranking(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get the latest ranking for a job."""
@@ -267,39 +450,154 @@ class Database:
             if not row:
                 return None
 
-            return json.loads(row["data"])
+            return orjson.loads(row["data"])
+
+    def get_latest_ranking_id(self, job_id: str) -> Optional[int]:
+        """Get the id of the latest ranking for a job (rankings are immutable, so it works as a version)."""
+        with self._get_connection() as conn:
+            row = conn.execute(
+                """SELECT id FROM rankings
+                   WHERE job_id = ?
+                   ORDER BY created_at DESC LIMIT 1""",
+                (job_id,)
+            ).fetchone()
+
+            return row["id"] if row else None
+
+    def get_latest_ranking_id_for_weights(
+        self, job_id: str, weights: Weights, scoring_config: str
+    ) -> Optional[int]:
+        """
+        Get the id of the latest ranking for a job if it was scored with these weights
+        and the same scoring config (see get_scoring_config_digest).
+        """
+        with self._get_connection() as conn:
+            row = conn.execute(
+                """SELECT id, weights, scoring_config FROM rankings
+                   WHERE job_id = ?
+                   ORDER BY created_at DESC LIMIT 1""",
+                (job_id,)
+            ).fetchone()
+
+            if (row and row["scoring_config"] == scoring_config
+                    and row["weights"] == _dumps(weights.model_dump()).decode()):
+                return row["id"]
+            return None
+
+    def get_latest_ranking_id_or_extraction(
+        self, job_id: str
+    ) -> Tuple[Optional[int], Optional[Dict[str, Any]]]:
+        """
+        Get the latest ranking id for a job or, when it has no ranking yet,
+        its extraction data (needed to compute one) in a single query.
+        """
+        with self._get_connection() as conn:
+            row = conn.execute(
+                """WITH latest AS (
+                       SELECT id FROM rankings
+                       WHERE job_id = ?
+                       ORDER BY created_at DESC LIMIT 1
+                   )
+                   SELECT (SELECT id FROM latest) AS ranking_id, e.data, e.compression
+                   FROM (SELECT 1)
+                   LEFT JOIN extractions e
+                     ON e.job_id = ? AND NOT EXISTS (SELECT 1 FROM latest)""",
+                (job_id, job_id)
+            ).fetchone()
+
+            if row["ranking_id"] is not None:
+                return row["ranking_id"], None
+            if row["data"] is None:
+                return None, None
+            return None, self._load_extraction(row)
+
+    def get_ranking(self, ranking_id: int) -> Optional[Dict[str, Any]]:
+        """Get a ranking by id."""
+        with self._get_connection() as conn:
+            row = conn.execute(
+                "SELECT data FROM rankings WHERE id = ?", (ranking_id,)
+            ).fetchone()
+
+            if not row:
+                return None
+
+            return orjson.loads(row["data"])
 
     # ══════════════════════════════════════════════════════════════════════════
     #  CONFIG
     # ══════════════════════════════════════════════════════════════════════════
 
-    def get_config(self, key: str, default: Any = None) -> Any:
-        """Get config value."""
+    def _cached(self, key: str, loader) -> Any:
+        """Return a config-derived value from the in-process cache, loading it on miss/expiry."""
+        entry = self._config_cache.get(key)
+        now = time.monotonic()
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        value = loader()
+        self._config_cache[key] = (now + CONFIG_CACHE_TTL, value)
+        return value
+
+    def _load_config(self, key: str) -> Any:
         with self._get_connection() as conn:
             row = conn.execute(
                 "SELECT value FROM config WHERE key = ?", (key,)
             ).fetchone()
 
-            if not row:
-                return default
+        if not row:
+            return _MISSING
+
+        return orjson.loads(row["value"])
+
+    def _prefetch_config(self, *keys: str):
+        """Load every expired/uncached key in one query, so the following get_config calls hit the cache."""
+        now = time.monotonic()
+        stale = [k for k in keys if (entry := self._config_cache.get(k)) is None or entry[0] <= now]
+        if not stale:
+            return
+
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                f"SELECT key, value FROM config WHERE key IN ({','.join('?' * len(stale))})", stale
+            ).fetchall()
+
+        values = {row["key"]: orjson.loads(row["value"]) for row in rows}
+        for key in stale:
+            self._config_cache[key] = (now + CONFIG_CACHE_TTL, values.get(key, _MISSING))
+            self._config_cache.pop(f"{key}:model", None)
+
+    def get_config(self, key: str, default: Any = None) -> Any:
+        """Get config value."""
+        value = self._cached(key, lambda: self._load_config(key))
+        return default if value is _MISSING else value
 
-            return json.loads(row["value"])
+    def _get_model(self, key: str, model: Type[BaseModel]) -> Any:
+        """Get a config section parsed into its model (cached alongside the raw value)."""
+        def load():
+            data = self.get_config(key)
+            return model(**data) if data else model()
+        return self._cached(f"{key}:model", load)
 
     def set_config(self, key: str, value: Any):
         """Set config value."""
-        with self._get_connection() as conn:
-            conn.execute(
+        self.set_configs({key: value})
+
+    def set_configs(self, values: Dict[str, Any]):
+        """Set several config values in one transaction."""
+        with self._get_connection(write=True) as conn:
+            conn.executemany(
                 """INSERT OR REPLACE INTO config (key, value)
                    VALUES (?, ?)""",
-                (key, json.dumps(value))
+                [(key, _dumps(value).decode()) for key, value in values.items()]
             )
+        for key in values:
+            self._config_cache.pop(key, None)
+            self._config_cache.pop(f"{key}:model", None)
+            self._config_cache.pop(f"{key}:digest", None)
+        self.config_version += 1
 
     def get_weights(self) -> Weights:
         """Get default weights from config."""
-        data = self.get_config("weights")
-        if data:
-            return Weights(**data)
-        return Weights()
+        return self._get_model("weights", Weights)
 
     def set_weights(self, weights: Weights):
         """Save default weights to config."""
@@ -319,10 +617,7 @@ class Database:
 
     def get_penalties(self) -> Penalties:
         """Get penalties from config."""
-        data = self.get_config("penalties")
-        if data:
-            return Penalties(**data)
-        return Penalties()
+        return self._get_model("penalties", Penalties)
 
     def set_penalties(self, penalties: Penalties):
         """Save penalties to config."""
@@ -330,10 +625,7 @@ class Database:
 
     def get_bonuses(self) -> Bonuses:
         """Get bonuses from config."""
-        data = self.get_config("bonuses")
-        if data:
-            return Bonuses(**data)
-        return Bonuses()
+        return self._get_model("bonuses", Bonuses)
 
     def set_bonuses(self, bonuses: Bonuses):
         """Save bonuses to config."""
@@ -341,15 +633,46 @@ class Database:
 
     def get_thresholds(self) -> Thresholds:
         """Get thresholds from config."""
-        data = self.get_config("thresholds")
-        if data:
-            return Thresholds(**data)
-        return Thresholds()
+        return self._get_model("thresholds", Thresholds)
 
     def set_thresholds(self, thresholds: Thresholds):
         """Save thresholds to config."""
         self.set_config("thresholds", thresholds.model_dump())
 
+    def set_app_config(
+        self,
+        weights: Optional[Weights] = None,
+        penalties: Optional[Penalties] = None,
+        bonuses: Optional[Bonuses] = None,
+        thresholds: Optional[Thresholds] = None,
+        top_results: Optional[int] = None
+    ):
+        """Save the provided app config sections atomically (None leaves a section unchanged)."""
+        values = {
+            key: value.model_dump() if isinstance(value, BaseModel) else value
+            for key, value in (
+                ("weights", weights),
+                ("penalties", penalties),
+                ("bonuses", bonuses),
+                ("thresholds", thresholds),
+                ("top_results", top_results),
+            )
+            if value is not None
+        }
+        if values:
+            self.set_configs(values)
+
+    def get_app_config_bundle(self) -> Tuple[Weights, Penalties, Bonuses, Thresholds, int]:
+        """Get weights, penalties, bonuses, thresholds and top results with a single read."""
+        self._prefetch_config("weights", "penalties", "bonuses", "thresholds", "top_results")
+        return (
+            self.get_weights(),
+            self.get_penalties(),
+            self.get_bonuses(),
+            self.get_thresholds(),
+            self.get_top_results(),
+        )
+
     # ══════════════════════════════════════════════════════════════════════════
     #  SERVICE MAPPINGS
     # ══════════════════════════════════════════════════════════════════════════
@@ -390,6 +713,21 @@ class Database:
         from ..services.scorer import DEFAULT_SERVICE_GROUPS
         self.set_config("service_groups", DEFAULT_SERVICE_GROUPS)
 
+    def get_scoring_config_digest(self) -> str:
+        """
+        Digest of the config the scorer reads besides the weights (the service groups).
+        Stored with each ranking so a ranking is only reused if that config is unchanged.
+        """
+        def load():
+            groups = _dumps_sorted(self.get_service_groups())
+            return hashlib.blake2b(groups, digest_size=16).hexdigest()
+        return self._cached("service_groups:digest", load)
+
+    def get_service_mappings_bundle(self) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+        """Get service synonyms and groups with a single read."""
+        self._prefetch_config("service_synonyms", "service_groups")
+        return self.get_service_synonyms(), self.get_service_groups()
+
 
 # Singleton instance
 _db: Optional[Database] = None
@@ -5,19 +5,27 @@ Uses asyncio to run extractions in background.
 
 import asyncio
 import logging
-from typing import Dict, Any, Optional
+import os
+import time
+from functools import partial
+from typing import Dict, Any, Optional, Callable
 from concurrent.futures import ThreadPoolExecutor
 
+from ..config import get_settings
 from ..db.storage import get_db
 from ..models import JobStatus
-from ..services.jira_client import JiraClient
+from ..services.jira_client import get_jira_client
 from ..services.extractor import extract_inc_with_teccms, extract_teccms_for_manual_analysis
 from ..services.scorer import calculate_ranking
 
 logger = logging.getLogger(__name__)
 
-# Thread pool for blocking Jira operations
-_executor = ThreadPoolExecutor(max_workers=4)
+# Thread pool for blocking Jira operations (I/O-bound, threads mostly wait on the network)
+_io_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="jira-io")
+
+# Thread pool for ranking calculation (CPU-bound), kept separate so scoring
+# never queues behind long-running extractions
+_cpu_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="scoring")
 
 # Store for active jobs (in-memory, for progress tracking)
 _active_jobs: Dict[str, Dict[str, Any]] = {}
@@ -25,6 +33,16 @@ _active_jobs: Dict[str, Dict[str, Any]] = {}
 # Set of cancelled job IDs
 _cancelled_jobs: set = set()
 
+# Per-job events for progress subscribers (SSE stream); replaced on every update
+_job_events: Dict[str, asyncio.Event] = {}
+
+# Seconds a finished job's progress info stays in _active_jobs
+ACTIVE_JOB_RETENTION_SECONDS = 60
+
+# Minimum seconds between progress writes to the database.
+# _active_jobs is updated on every ticket and is what the API reads for live progress.
+PROGRESS_FLUSH_INTERVAL = 0.5
+
 
 class JobCancelledException(Exception):
     """Raised when a job is cancelled by user."""
@@ -54,6 +72,7 @@ def cancel_job(job_id: str) -> bool:
     # Clean up from active jobs
     if job_id in _active_jobs:
         _active_jobs[job_id]["status"] = "cancelled"
+        _notify_job_update(job_id)
 
     return True
 
@@ -68,6 +87,79 @@ def get_job_progress(job_id: str) -> Optional[Dict[str, Any]]:
     return _active_jobs.get(job_id)
 
 
+def get_job_update_event(job_id: str) -> Optional[asyncio.Event]:
+    """
+    Get an event that is set on the next progress/status change of an active job.
+    Returns None if the job is not active. Must be called from the event loop.
+    """
+    if job_id not in _active_jobs:
+        return None
+    return _job_events.setdefault(job_id, asyncio.Event())
+
+
+def _notify_job_update(job_id: str):
+    """Wake up subscribers waiting on the current event of a job (event loop only)."""
+    event = _job_events.pop(job_id, None)
+    if event is not None:
+        event.set()
+
+
+def _forget_job(job_id: str):
+    """Drop in-memory tracking of a finished job."""
+    _active_jobs.pop(job_id, None)
+    _notify_job_update(job_id)
+
+
+def _make_progress_callback(db, job_id: str, teccm_offset: int = 0) -> Callable[[int, int], None]:
+    """
+    Build a progress callback for an extraction job.
+
+    In-memory progress is updated on every call, but the database is only
+    written every PROGRESS_FLUSH_INTERVAL seconds (and always on the last ticket).
+
+    Args:
+        db: Database instance
+        job_id: Job identifier
+        teccm_offset: Tickets in the total that are not TECCMs (e.g. the INC)
+    """
+    state = {"last_flush": 0.0}
+    # Callback runs in the I/O pool: subscribers are woken through the loop
+    loop = asyncio.get_running_loop()
+
+    def progress_callback(current: int, total: int):
+        # Check for cancellation
+        if is_job_cancelled(job_id):
+            raise JobCancelledException(f"Job {job_id} was cancelled")
+
+        _active_jobs[job_id].update({
+            "progress": current,
+            "total": total,
+            "status": "extracting"
+        })
+        if job_id in _job_events:
+            loop.call_soon_threadsafe(_notify_job_update, job_id)
+
+        now = time.monotonic()
+        if current < total and now - state["last_flush"] < PROGRESS_FLUSH_INTERVAL:
+            return
+        state["last_flush"] = now
+
+        progress_pct = int((current / total) * 100) if total > 0 else 0
+        db.update_job_status(job_id, JobStatus.RUNNING, progress=progress_pct, total_teccms=total - teccm_offset)
+
+    return progress_callback
+
+
+def _count_teccms(extraction_data: Dict[str, Any]) -> int:
+    """Count TECCMs in an extraction based on the include_external_maintenance setting."""
+    extraction_info = extraction_data.get('extraction_info', {})
+    counts = extraction_info.get('ticket_counts', {})
+    total = counts.get('CHANGE', 0)
+    if extraction_info.get('search_options', {}).get('include_external_maintenance', False):
+        total += counts.get('EXTERNAL MAINTENANCE', 0)
+    return total
+
+
 async def run_extraction_job(
     job_id: str,
     inc_key: str,
@@ -94,57 +186,35 @@ async def run_extraction_job(
         search_options: Advanced search options dict
     """
     db = get_db()
+    loop = asyncio.get_running_loop()
     _active_jobs[job_id] = {"progress": 0, "total": 0, "status": "connecting"}
 
     try:
         # Update status to running
         db.update_job_status(job_id, JobStatus.RUNNING)
-        logger.info(f"Starting extraction job {job_id} for {inc_key}")
-        if search_options:
-            logger.info(f"Using advanced search options: {search_options}")
+        logger.info("Starting extraction job %s for %s", job_id, inc_key)
 
         # Connect to Jira (blocking operation, run in thread pool)
         _active_jobs[job_id]["status"] = "connecting"
+        _notify_job_update(job_id)
 
-        loop = asyncio.get_event_loop()
-
-        def connect_jira():
-            client = JiraClient(username, password)
-            success, message = client.connect()
-            if not success:
-                raise Exception(f"Failed to connect to Jira: {message}")
-            return client
-
-        client = await loop.run_in_executor(_executor, connect_jira)
+        client = await loop.run_in_executor(_io_executor, get_jira_client, username, password)
         logger.info(f"Connected to Jira for job {job_id}")
 
-        # Define progress callback with cancellation check
-        def progress_callback(current: int, total: int):
-            # Check for cancellation
-            if is_job_cancelled(job_id):
-                raise JobCancelledException(f"Job {job_id} was cancelled")
-
-            _active_jobs[job_id].update({
-                "progress": current,
-                "total": total,
-                "status": "extracting"
-            })
-            progress_pct = int((current / total) * 100) if total > 0 else 0
-            db.update_job_status(job_id, JobStatus.RUNNING, progress=progress_pct, total_teccms=total - 1)
+        # Progress callback with cancellation check (total includes the INC itself)
+        progress_callback = _make_progress_callback(db, job_id, teccm_offset=1)
 
         # Run extraction (blocking, in thread pool)
         _active_jobs[job_id]["status"] = "extracting"
+        _notify_job_update(job_id)
 
-        def do_extraction():
-            return extract_inc_with_teccms(
-                client.client,
-                inc_key,
-                window,
-                progress_callback,
-                search_options=search_options
+        extraction_data = await loop.run_in_executor(
+            _io_executor,
+            partial(
+                extract_inc_with_teccms, client.client, inc_key, window, progress_callback,
+                num_threads=get_settings().extraction_threads, search_options=search_options
             )
-
-        extraction_data = await loop.run_in_executor(_executor, do_extraction)
+        )
         logger.info(f"Extraction complete for job {job_id}: {len(extraction_data.get('tickets', []))} tickets")
 
         # Save extraction data
@@ -152,32 +222,26 @@ async def run_extraction_job(
 
         # Calculate initial ranking
         _active_jobs[job_id]["status"] = "scoring"
+        _notify_job_update(job_id)
 
-        def do_scoring():
-            return calculate_ranking(extraction_data)
-
-        ranking_data = await loop.run_in_executor(_executor, do_scoring)
+        ranking_data = await loop.run_in_executor(_cpu_executor, calculate_ranking, extraction_data)
         logger.info(f"Scoring complete for job {job_id}: {len(ranking_data.get('ranking', []))} TECCMs ranked")
 
-        # Save ranking
-        from ..models import Weights
-        db.save_ranking(job_id, Weights(), ranking_data)
+        # Save ranking (scored with default weights)
+        db.save_ranking(job_id, None, ranking_data)
 
         # Update job as completed
-        # Count TECCMs based on include_external_maintenance setting
-        include_ext = extraction_data.get('extraction_info', {}).get('search_options', {}).get('include_external_maintenance', False)
-        if include_ext:
-            total_teccms = len([t for t in extraction_data.get('tickets', []) if t.get('ticket_type') in ('CHANGE', 'EXTERNAL MAINTENANCE')])
-        else:
-            total_teccms = len([t for t in extraction_data.get('tickets', []) if t.get('ticket_type') == 'CHANGE'])
+        total_teccms = _count_teccms(extraction_data)
         db.update_job_status(job_id, JobStatus.COMPLETED, progress=100, total_teccms=total_teccms)
 
         _active_jobs[job_id]["status"] = "completed"
+        _notify_job_update(job_id)
         logger.info(f"Job {job_id} completed successfully")
 
     except JobCancelledException:
         logger.info(f"Job {job_id} was cancelled by user")
         _active_jobs[job_id]["status"] = "cancelled"
+        _notify_job_update(job_id)
         # Status already updated in cancel_job()
 
     except Exception as e:
@@ -187,15 +251,15 @@ async def run_extraction_job(
             db.update_job_status(job_id, JobStatus.FAILED, error=str(e))
             _active_jobs[job_id]["status"] = "failed"
             _active_jobs[job_id]["error"] = str(e)
+            _notify_job_update(job_id)
 
     finally:
         # Clean up cancelled job from tracking set
         if job_id in _cancelled_jobs:
             _cancelled_jobs.discard(job_id)
-        # Clean up after a delay (keep progress info available for a bit)
-        await asyncio.sleep(60)
-        if job_id in _active_jobs:
-            del _active_jobs[job_id]
+        # Clean up after a delay (keep progress info available for a bit).
+        # Scheduled on the loop so this coroutine and its large locals are released now.
+        loop.call_later(ACTIVE_JOB_RETENTION_SECONDS, _forget_job, job_id)
 
 
 def start_extraction_job(
@@ -237,54 +301,34 @@ async def run_manual_analysis_job(
         search_options: Advanced search options dict
     """
     db = get_db()
+    loop = asyncio.get_running_loop()
     _active_jobs[job_id] = {"progress": 0, "total": 0, "status": "connecting"}
 
     try:
         # Update status to running
         db.update_job_status(job_id, JobStatus.RUNNING)
-        logger.info(f"Starting manual analysis job {job_id}")
-        logger.info(f"Virtual incident: {virtual_incident}")
+        logger.info("Starting manual analysis job %s (virtual incident: %s)", job_id, virtual_incident)
 
         # Connect to Jira
         _active_jobs[job_id]["status"] = "connecting"
-        loop = asyncio.get_event_loop()
-
-        def connect_jira():
-            client = JiraClient(username, password)
-            success, message = client.connect()
-            if not success:
-                raise Exception(f"Failed to connect to Jira: {message}")
-            return client
-
-        client = await loop.run_in_executor(_executor, connect_jira)
+        _notify_job_update(job_id)
+        client = await loop.run_in_executor(_io_executor, get_jira_client, username, password)
         logger.info(f"Connected to Jira for manual analysis job {job_id}")
 
-        # Define progress callback with cancellation check
-        def progress_callback(current: int, total: int):
-            # Check for cancellation
-            if is_job_cancelled(job_id):
-                raise JobCancelledException(f"Job {job_id} was cancelled")
-
-            _active_jobs[job_id].update({
-                "progress": current,
-                "total": total,
-                "status": "extracting"
-            })
-            progress_pct = int((current / total) * 100) if total > 0 else 0
-            db.update_job_status(job_id, JobStatus.RUNNING, progress=progress_pct, total_teccms=total)
+        # Progress callback with cancellation check
+        progress_callback = _make_progress_callback(db, job_id)
 
         # Run extraction with virtual incident
         _active_jobs[job_id]["status"] = "extracting"
+        _notify_job_update(job_id)
 
-        def do_extraction():
-            return extract_teccms_for_manual_analysis(
-                client.client,
-                virtual_incident,
-                progress_callback,
-                search_options=search_options
+        extraction_data = await loop.run_in_executor(
+            _io_executor,
+            partial(
+                extract_teccms_for_manual_analysis, client.client, virtual_incident, progress_callback,
+                num_threads=get_settings().extraction_threads, search_options=search_options
             )
-
-        extraction_data = await loop.run_in_executor(_executor, do_extraction)
+        )
         logger.info(f"Manual extraction complete for job {job_id}: {len(extraction_data.get('tickets', []))} tickets")
 
         # Save extraction data
@@ -292,31 +336,26 @@ async def run_manual_analysis_job(
 
         # Calculate ranking
         _active_jobs[job_id]["status"] = "scoring"
+        _notify_job_update(job_id)
 
-        def do_scoring():
-            return calculate_ranking(extraction_data)
-
-        ranking_data = await loop.run_in_executor(_executor, do_scoring)
+        ranking_data = await loop.run_in_executor(_cpu_executor, calculate_ranking, extraction_data)
         logger.info(f"Scoring complete for manual job {job_id}: {len(ranking_data.get('ranking', []))} TECCMs ranked")
 
-        # Save ranking
-        from ..models import Weights
-        db.save_ranking(job_id, Weights(), ranking_data)
+        # Save ranking (scored with default weights)
+        db.save_ranking(job_id, None, ranking_data)
 
         # Update job as completed
-        include_ext = extraction_data.get('extraction_info', {}).get('search_options', {}).get('include_external_maintenance', False)
-        if include_ext:
-            total_teccms = len([t for t in extraction_data.get('tickets', []) if t.get('ticket_type') in ('CHANGE', 'EXTERNAL MAINTENANCE')])
-        else:
-            total_teccms = len([t for t in extraction_data.get('tickets', []) if t.get('ticket_type') == 'CHANGE'])
+        total_teccms = _count_teccms(extraction_data)
         db.update_job_status(job_id, JobStatus.COMPLETED, progress=100, total_teccms=total_teccms)
 
         _active_jobs[job_id]["status"] = "completed"
+        _notify_job_update(job_id)
         logger.info(f"Manual analysis job {job_id} completed successfully")
 
     except JobCancelledException:
         logger.info(f"Manual analysis job {job_id} was cancelled by user")
         _active_jobs[job_id]["status"] = "cancelled"
+        _notify_job_update(job_id)
         # Status already updated in cancel_job()
 
     except Exception as e:
@@ -326,14 +365,15 @@ async def run_manual_analysis_job(
             db.update_job_status(job_id, JobStatus.FAILED, error=str(e))
             _active_jobs[job_id]["status"] = "failed"
             _active_jobs[job_id]["error"] = str(e)
+            _notify_job_update(job_id)
 
     finally:
         # Clean up cancelled job from tracking set
         if job_id in _cancelled_jobs:
             _cancelled_jobs.discard(job_id)
-        await asyncio.sleep(60)
-        if job_id in _active_jobs:
-            del _active_jobs[job_id]
+        # Clean up after a delay (keep progress info available for a bit).
+        # Scheduled on the loop so this coroutine and its large locals are released now.
+        loop.call_later(ACTIVE_JOB_RETENTION_SECONDS, _forget_job, job_id)
 
 
 def start_manual_analysis_job(
@@ -3,20 +3,30 @@ FastAPI main application.
 INC-TECCM Correlation Analyzer Backend.
 """
 
+import hashlib
 import logging
+import os
 from pathlib import Path
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request
+from urllib.parse import parse_qs
+
+import orjson
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from starlette.responses import RedirectResponse, Response
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from .config import get_settings
 from .routers import auth, analysis, config
 from .db.storage import get_db
+from .services.jira_client import close_jira_clients
 
 # Path to frontend static files
 FRONTEND_DIR = Path(__file__).parent.parent.parent / "frontend" / "dist"
+INDEX_PATH = str((FRONTEND_DIR / "index.html").resolve())
+ASSETS_DIR = str((FRONTEND_DIR / "assets").resolve())
 
 # Configure logging
 logging.basicConfig(
@@ -24,6 +34,18 @@ logging.basicConfig(
     format='%(asctime)s %(levelname)s [%(name)s] %(message)s'
 )
 logger = logging.getLogger(__name__)
+access_logger = logging.getLogger("app.access")
+
+settings = get_settings()
+
+# Static JSON bodies (probe targets), encoded once
+HEALTH_BODY = orjson.dumps({"status": "healthy"})
+ROOT_BODY = orjson.dumps({
+    "name": "INC-TECCM Correlation Analyzer",
+    "version": "1.0.0",
+    "status": "running",
+    "note": "Frontend not built. Run 'npm run build' in frontend directory."
+})
 
 
 @asynccontextmanager
@@ -31,89 +53,241 @@ async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
     logger.info("Starting INC-TECCM Correlation Analyzer...")
-    settings = get_settings()
     logger.info(f"Jira URL: {settings.jira_url}")
 
     # Initialize database
     db = get_db()
     logger.info(f"Database initialized: {db.db_path}")
 
+    # Cache SPA index in memory (served on every client-side route)
+    app.state.index_bytes = None
+    if os.path.exists(INDEX_PATH):
+        with open(INDEX_PATH, "rb") as f:
+            app.state.index_bytes = f.read()
+        app.state.index_etag = '"' + hashlib.md5(app.state.index_bytes).hexdigest() + '"'
+
     yield
 
     # Shutdown
     logger.info("Shutting down...")
+    close_jira_clients()
+    db.close()
+
+
+class ErrorAccessLogMiddleware:
+    """
+    Pure ASGI access log that only records failed requests (status >= 400).
+    Production runs uvicorn with --no-access-log, so successful requests cost nothing.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] >= 400:
+                access_logger.warning(
+                    "%s %s -> %d", scope["method"], scope["path"], message["status"]
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class StreamSafeGZipMiddleware(GZipMiddleware):
+    """
+    GZip that passes server-sent event streams (paths ending in /stream) through
+    untouched: older Starlette releases buffer text/event-stream responses.
+    """
 
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and scope["path"].endswith("/stream"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
 
-# Create FastAPI app
+
+class ProfilingMiddleware:
+    """
+    Opt-in pyinstrument profiler: requests with ?profile=1 return the HTML
+    profile instead of the normal response. Only installed when ENABLE_PROFILING is set.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or parse_qs(scope["query_string"]).get(b"profile") != [b"1"]:
+            await self.app(scope, receive, send)
+            return
+
+        from pyinstrument import Profiler
+
+        async def discard(message):
+            pass
+
+        profiler = Profiler(interval=0.001, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            # On errors the exception propagates (500 from the server error handler)
+            profiler.stop()
+
+        body = profiler.output_html().encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/html; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# Create FastAPI app (SPA, static files and health check)
 app = FastAPI(
     title="INC-TECCM Correlation Analyzer",
     description="API for analyzing correlations between incidents and changes in Jira",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    docs_url=None,
+    redoc_url=None,
+    openapi_url=None,
 )
 
-# Configure CORS
-settings = get_settings()
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.cors_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+# JSON API lives in its own sub-app so API calls only pass through the
+# middleware they need (CORS); docs are served at {api_prefix}/docs
+api_app = FastAPI(
+    title="INC-TECCM Correlation Analyzer",
+    description="API for analyzing correlations between incidents and changes in Jira",
+    version="1.0.0",
 )
 
+# Configure CORS (only needed for cross-origin dev servers; the built SPA is
+# same-origin, so with no CORS_ORIGINS the middleware is skipped entirely)
+if settings.cors_origins:
+    api_app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.cors_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
 # Include routers
-app.include_router(auth.router, prefix=settings.api_prefix)
-app.include_router(analysis.router, prefix=settings.api_prefix)
-app.include_router(config.router, prefix=settings.api_prefix)
+api_app.include_router(auth.router)
+api_app.include_router(analysis.router)
+api_app.include_router(config.router)
+
+app.mount(settings.api_prefix, api_app)
+
+# Compress JSON payloads and static assets (not the SSE progress stream)
+app.add_middleware(StreamSafeGZipMiddleware, minimum_size=500)
+app.add_middleware(ErrorAccessLogMiddleware)
+
+if settings.enable_profiling:
+    try:
+        import pyinstrument  # noqa: F401
+        app.add_middleware(ProfilingMiddleware)
+        logger.warning("Request profiling enabled (?profile=1)")
+    except ImportError:
+        logger.warning("ENABLE_PROFILING is set but pyinstrument is not installed")
+
+
+# Keep the old documentation URLs working
+@app.get("/docs", include_in_schema=False)
+async def docs_redirect():
+    return RedirectResponse(f"{settings.api_prefix}/docs")
+
+
+@app.get("/redoc", include_in_schema=False)
+async def redoc_redirect():
+    return RedirectResponse(f"{settings.api_prefix}/redoc")
+
+
+@app.get("/openapi.json", include_in_schema=False)
+async def openapi_redirect():
+    return RedirectResponse(f"{settings.api_prefix}/openapi.json")
 
 
 @app.get("/health")
 async def health():
     """Health check endpoint."""
-    return {"status": "healthy"}
+    return Response(HEALTH_BODY, media_type="application/json")
 
 
-# Serve frontend static files if they exist
-if FRONTEND_DIR.exists():
-    # Mount static assets (JS, CSS, etc.)
-    app.mount("/assets", StaticFiles(directory=FRONTEND_DIR / "assets"), name="assets")
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles for Vite build output (content-hashed names, safe to cache forever)."""
 
-    # Routes that should NOT be handled by SPA (let FastAPI handle them)
-    EXCLUDED_PATHS = {"/api", "/docs", "/redoc", "/openapi.json", "/health"}
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
+class SPAMiddleware:
+    """Pure ASGI middleware that serves the SPA index for non-API GET routes."""
+
+    # Prefixes always handled by FastAPI (single startswith call with a tuple)
+    SKIP_PREFIXES = ("/api/", "/assets/")
 
-    @app.middleware("http")
-    async def spa_middleware(request: Request, call_next):
-        """Middleware to serve SPA for non-API routes."""
-        path = request.url.path
+    def __init__(self, app: ASGIApp, excluded: set):
+        self.app = app
+        self.excluded = frozenset(excluded)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
 
         # Check if path should be handled by FastAPI
-        should_skip = (
-            path.startswith("/api/") or
-            path.startswith("/assets/") or
-            path in EXCLUDED_PATHS
-        )
+        path = scope["path"]
+        should_skip = path in self.excluded or path.startswith(self.SKIP_PREFIXES)
+
+        # For all other GET requests, serve the cached SPA index (if it exists)
+        state = scope["app"].state
+        index_bytes = getattr(state, "index_bytes", None)
+        if should_skip or index_bytes is None:
+            await self.app(scope, receive, send)
+            return
+
+        etag = state.index_etag.encode()
+        headers = [
+            (b"etag", etag),
+            # Always revalidate so new builds propagate; unchanged index costs a 304
+            (b"cache-control", b"no-cache"),
+        ]
+        if dict(scope["headers"]).get(b"if-none-match") == etag:
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
 
-        if should_skip:
-            # Let FastAPI handle it
-            return await call_next(request)
+        headers += [
+            (b"content-type", b"text/html; charset=utf-8"),
+            (b"content-length", str(len(index_bytes)).encode()),
+        ]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": index_bytes})
 
-        # For all other GET requests, serve the SPA
-        if request.method == "GET":
-            index_file = FRONTEND_DIR / "index.html"
-            if index_file.exists():
-                return FileResponse(index_file)
 
-        # For non-GET or if index doesn't exist, continue to FastAPI
-        return await call_next(request)
+# Serve frontend static files if they exist
+if FRONTEND_DIR.exists():
+    # Mount static assets (JS, CSS, etc.)
+    app.mount("/assets", ImmutableStaticFiles(directory=ASSETS_DIR), name="assets")
+
+    # Routes that should NOT be handled by SPA (let FastAPI handle them)
+    EXCLUDED_PATHS = frozenset({"/api", "/docs", "/redoc", "/openapi.json", "/health"})
+
+    app.add_middleware(SPAMiddleware, excluded=EXCLUDED_PATHS)
 
 else:
     @app.get("/")
     async def root():
         """Root endpoint when frontend is not available."""
-        return {
-            "name": "INC-TECCM Correlation Analyzer",
-            "version": "1.0.0",
-            "status": "running",
-            "note": "Frontend not built. Run 'npm run build' in frontend directory."
-        }
+        return Response(ROOT_BODY, media_type="application/json")
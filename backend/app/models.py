@@ -3,8 +3,8 @@ Modelos Pydantic para la API.
 """
 
 from datetime import datetime
-from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Tuple, Union
+from pydantic import BaseModel, ConfigDict, Field
 from enum import Enum
 
 
@@ -87,6 +87,9 @@ class ExtractionResponse(BaseModel):
 
 
 class JobInfo(BaseModel):
+    # Keep status as its plain string value (no enum round-trip when listing jobs)
+    model_config = ConfigDict(use_enum_values=True)
+
     job_id: str
     inc: str
     window: str
@@ -125,7 +128,34 @@ class ScoreRequest(BaseModel):
 class SubScoreDetail(BaseModel):
     score: float
     reason: str
-    matches: List[str] = []
+    matches: Tuple[str, ...] = ()
+
+
+class RankingDetails(BaseModel):
+    """Razones y matches de cada sub-score (ScoreDetail aplanado)."""
+    time_reason: str = ""
+    time_matches: Tuple[str, ...] = ()
+    service_reason: str = ""
+    service_matches: Tuple[str, ...] = ()
+    infra_reason: str = ""
+    infra_matches: Tuple[str, ...] = ()
+    org_reason: str = ""
+    org_matches: Tuple[str, ...] = ()
+    penalties: Tuple[str, ...] = ()
+    bonuses: Tuple[str, ...] = ()
+
+
+class TECCMInfo(BaseModel):
+    """Datos del TECCM mostrados en ranking y detalle."""
+    assignee: Optional[str] = None
+    team: Optional[str] = None
+    planned_start: Optional[str] = None
+    planned_end: Optional[str] = None
+    live_intervals: Tuple[Dict[str, str], ...] = ()
+    resolution: Optional[str] = None
+    services: Tuple[str, ...] = ()
+    hosts: Tuple[str, ...] = ()
+    technologies: Tuple[str, ...] = ()
 
 
 class TECCMRankingItem(BaseModel):
@@ -134,22 +164,22 @@ class TECCMRankingItem(BaseModel):
     summary: str
     final_score: float
     sub_scores: Dict[str, float]
-    details: Dict[str, Any]
+    details: RankingDetails
 
     # Extra info for detail view
     assignee: Optional[str] = None
     team: Optional[str] = None
     planned_start: Optional[str] = None
     planned_end: Optional[str] = None
-    live_intervals: List[Dict[str, str]] = []
+    live_intervals: Tuple[Dict[str, str], ...] = ()
     resolution: Optional[str] = None
-    services: List[str] = []
-    hosts: List[str] = []
-    technologies: List[str] = []
+    services: Tuple[str, ...] = ()
+    hosts: Tuple[str, ...] = ()
+    technologies: Tuple[str, ...] = ()
 
     # Penalties and bonuses applied
-    penalties: List[str] = []
-    bonuses: List[str] = []
+    penalties: Tuple[str, ...] = ()
+    bonuses: Tuple[str, ...] = ()
 
 
 class IncidentInfo(BaseModel):
@@ -157,14 +187,26 @@ class IncidentInfo(BaseModel):
     summary: str
     first_impact_time: Optional[str] = None
     created_at: Optional[str] = None
-    services: List[str] = []
-    hosts: List[str] = []
-    technologies: List[str] = []
+    services: Tuple[str, ...] = ()
+    hosts: Tuple[str, ...] = ()
+    technologies: Tuple[str, ...] = ()
+
+
+class RankingAnalysis(BaseModel):
+    """Metadatos del scoring (pesos y parámetros usados)."""
+    teccm_analyzed: int
+    teccm_in_ranking: int
+    scored_at: str
+    weights: Dict[str, float]
+    # Valores tal cual se guardaron (los enteros no se convierten a float)
+    thresholds: Optional[Dict[str, Union[int, float]]] = None
+    penalties: Optional[Dict[str, Union[int, float]]] = None
+    bonuses: Optional[Dict[str, Union[int, float]]] = None
 
 
 class RankingResponse(BaseModel):
     incident: IncidentInfo
-    analysis: Dict[str, Any]
+    analysis: RankingAnalysis
     ranking: List[TECCMRankingItem]
 
 
@@ -173,7 +215,9 @@ class TECCMDetailResponse(BaseModel):
     summary: str
     final_score: float
     sub_scores: Dict[str, SubScoreDetail]
-    teccm_info: Dict[str, Any]
+    penalties: Tuple[str, ...] = ()
+    bonuses: Tuple[str, ...] = ()
+    teccm_info: TECCMInfo
     jira_url: str
 
 
@@ -3,9 +3,16 @@ Analysis router.
 Handles extraction jobs, scoring, and ranking.
 """
 
+import asyncio
 import logging
+import re
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 from typing import Optional
-from fastapi import APIRouter, HTTPException, Depends, Request
+import orjson
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
 from ..models import (
     ExtractionRequest, ExtractionResponse,
@@ -14,19 +21,33 @@ from ..models import (
     ScoreRequest, RankingResponse, TECCMDetailResponse,
     Weights
 )
-from ..db.storage import get_db
-from ..jobs.extraction import start_extraction_job, start_manual_analysis_job, get_job_progress, cancel_job
+from ..db.storage import Database, get_db
+from ..jobs.extraction import (
+    start_extraction_job, start_manual_analysis_job, get_job_progress, get_job_update_event, cancel_job
+)
 from ..services.scorer import calculate_ranking, get_teccm_detail
+from ..services.extractor import TECHNOLOGIES, SERVICE_SYNONYMS
 from ..routers.auth import require_auth, SessionData
-from ..config import get_settings
+from ..config import Settings, get_settings
+from ..responses import ORJSONResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/analysis", tags=["analysis"])
 
+# Incident keys accepted by /extract (case-insensitive, normalized to upper case)
+INC_KEY_RE = re.compile(r"INC-[A-Z0-9]+", re.IGNORECASE)
+
+# Serialized ranking responses kept in memory (keyed by ranking id + top)
+RANKING_CACHE_SIZE = 64
+
+# Seconds between keep-alive comments on idle job progress streams
+STREAM_KEEPALIVE_SECONDS = 15
+
 
 @router.post("/extract", response_model=ExtractionResponse)
 async def start_extraction(
     request: ExtractionRequest,
+    db: Database = Depends(get_db),
     session: SessionData = Depends(require_auth)
 ):
     """
@@ -42,12 +63,10 @@ async def start_extraction(
     - extra_jql: Additional JQL filter
     - project: Jira project to search (default "TECCM")
     """
-    db = get_db()
-
     # Validate INC format
-    inc = request.inc.upper()
-    if not inc.startswith("INC-"):
+    if not INC_KEY_RE.fullmatch(request.inc):
         raise HTTPException(status_code=400, detail="Invalid INC format. Expected INC-XXXXXX")
+    inc = request.inc.upper()
 
     # Determine window string for display
     if request.search_options:
@@ -77,29 +96,20 @@ async def start_extraction(
             search_summary = ", ".join(summary_parts)
 
     # Create job with metadata
-    job_id = db.create_job(
+    job_id = await asyncio.to_thread(
+        db.create_job,
         inc=inc,
         window=window_display,
         job_type=job_type,
         username=session.username,
         search_summary=search_summary
     )
-    logger.info(f"Created job {job_id} for {inc} with window {window_display} (type={job_type}, user={session.username})")
-
     # Convert search_options to dict if present
-    search_options_dict = None
-    if request.search_options:
-        search_options_dict = {
-            "window_before": request.search_options.window_before,
-            "window_after": request.search_options.window_after,
-            "include_active": request.search_options.include_active,
-            "include_no_end": request.search_options.include_no_end,
-            "include_external_maintenance": request.search_options.include_external_maintenance,
-            "max_results": request.search_options.max_results,
-            "extra_jql": request.search_options.extra_jql,
-            "project": request.search_options.project,
-        }
-        logger.info(f"Advanced search: include_active={request.search_options.include_active}, include_no_end={request.search_options.include_no_end}, include_external_maintenance={request.search_options.include_external_maintenance}")
+    search_options_dict = request.search_options.model_dump() if request.search_options else None
+    logger.info(
+        "Created job %s for %s with window %s (type=%s, user=%s, search_options=%s)",
+        job_id, inc, window_display, job_type, session.username, search_options_dict
+    )
 
     # Start background extraction
     start_extraction_job(
@@ -120,6 +130,7 @@ async def start_extraction(
 @router.post("/manual", response_model=ExtractionResponse)
 async def start_manual_analysis(
     request: ManualAnalysisRequest,
+    db: Database = Depends(get_db),
     session: SessionData = Depends(require_auth)
 ):
     """
@@ -128,10 +139,6 @@ async def start_manual_analysis(
     Creates a virtual incident from the provided parameters and searches
     for matching TECCMs in the time window.
     """
-    from datetime import datetime
-
-    db = get_db()
-
     # Parse and validate impact_time
     try:
         impact_dt = datetime.fromisoformat(request.impact_time.replace('Z', ''))
@@ -163,28 +170,18 @@ async def start_manual_analysis(
     search_summary = ", ".join(summary_parts) if summary_parts else None
 
     # Create job with manual type
-    job_id = db.create_job(
+    job_id = await asyncio.to_thread(
+        db.create_job,
         inc=display_name,
         window=window_display,
         job_type="manual",
         username=session.username,
         search_summary=search_summary
     )
-    logger.info(f"Created manual analysis job {job_id}: {display_name} (user={session.username})")
+    logger.info("Created manual analysis job %s: %s (user=%s)", job_id, display_name, session.username)
 
     # Build search_options dict
-    search_options_dict = None
-    if request.search_options:
-        search_options_dict = {
-            "window_before": request.search_options.window_before,
-            "window_after": request.search_options.window_after,
-            "include_active": request.search_options.include_active,
-            "include_no_end": request.search_options.include_no_end,
-            "include_external_maintenance": request.search_options.include_external_maintenance,
-            "max_results": request.search_options.max_results,
-            "extra_jql": request.search_options.extra_jql,
-            "project": request.search_options.project,
-        }
+    search_options_dict = request.search_options.model_dump() if request.search_options else None
 
     # Build virtual incident data
     virtual_incident = {
@@ -211,21 +208,19 @@ async def start_manual_analysis(
     )
 
 
-@router.get("/options/technologies")
+@router.get("/options/technologies", response_class=ORJSONResponse)
 async def get_technologies(
     session: SessionData = Depends(require_auth)
 ):
     """Get list of available technologies for manual analysis."""
-    from ..services.extractor import TECHNOLOGIES
     return {"technologies": sorted(TECHNOLOGIES)}
 
 
-@router.get("/options/services")
+@router.get("/options/services", response_class=ORJSONResponse)
 async def get_services(
     session: SessionData = Depends(require_auth)
 ):
     """Get list of available service names for manual analysis."""
-    from ..services.extractor import SERVICE_SYNONYMS
     # Return the canonical service names (keys of the synonyms dict)
     return {"services": sorted(SERVICE_SYNONYMS.keys())}
 
@@ -233,27 +228,27 @@ async def get_services(
 @router.get("/jobs", response_model=JobListResponse)
 async def list_jobs(
     limit: int = 50,
+    db: Database = Depends(get_db),
     session: SessionData = Depends(require_auth)
 ):
     """
     Get list of recent jobs.
     """
-    db = get_db()
-    jobs = db.get_jobs(limit=limit)
+    jobs = await asyncio.to_thread(db.get_jobs, limit)
 
-    return JobListResponse(jobs=jobs)
+    return Response(JobListResponse(jobs=jobs).model_dump_json(), media_type="application/json")
 
 
 @router.get("/jobs/{job_id}", response_model=JobInfo)
 async def get_job(
     job_id: str,
+    db: Database = Depends(get_db),
     session: SessionData = Depends(require_auth)
 ):
     """
     Get job status and progress.
     """
-    db = get_db()
-    job = db.get_job(job_id)
+    job = await asyncio.to_thread(db.get_job, job_id)
 
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -265,26 +260,71 @@ async def get_job(
         if progress.get("total", 0) > 0:
             job.progress = int((progress["progress"] / progress["total"]) * 100)
 
-    return job
+    # Polled every second by the frontend: serialize directly, the model is already valid
+    return Response(job.model_dump_json(), media_type="application/json")
+
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_job(
+    job_id: str,
+    db: Database = Depends(get_db),
+    session: SessionData = Depends(require_auth)
+):
+    """
+    Stream job progress as server-sent events.
+    Sends a "progress" event on every in-memory update and a final "done" event
+    with the job as returned by GET /jobs/{job_id}. Polling that endpoint still works.
+    """
+    if not await asyncio.to_thread(db.get_job, job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        while True:
+            # Take the event before reading progress so no update is missed
+            event = get_job_update_event(job_id)
+            progress = get_job_progress(job_id)
+            if event is None or progress is None or progress["status"] in ("completed", "failed", "cancelled"):
+                break
+
+            total = progress.get("total", 0)
+            yield b"event: progress\ndata: " + orjson.dumps({
+                "phase": progress["status"],
+                "progress": int((progress["progress"] / total) * 100) if total > 0 else 0,
+                "total": total,
+            }) + b"\n\n"
+
+            try:
+                await asyncio.wait_for(event.wait(), STREAM_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+
+        job = await asyncio.to_thread(db.get_job, job_id)
+        if job:
+            yield b"event: done\ndata: " + job.model_dump_json().encode() + b"\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
-@router.delete("/jobs/{job_id}")
+@router.delete("/jobs/{job_id}", response_class=ORJSONResponse)
 async def delete_job(
     job_id: str,
+    db: Database = Depends(get_db),
     session: SessionData = Depends(require_auth)
 ):
     """
     Delete a job and its data.
     """
-    db = get_db()
-
-    if not db.delete_job(job_id):
+    if not await asyncio.to_thread(db.delete_job, job_id):
         raise HTTPException(status_code=404, detail="Job not found")
 
     return {"success": True, "message": "Job deleted"}
 
 
-@router.post("/jobs/{job_id}/cancel")
+@router.post("/jobs/{job_id}/cancel", response_class=ORJSONResponse)
 async def cancel_job_endpoint(
     job_id: str,
     session: SessionData = Depends(require_auth)
@@ -301,109 +341,117 @@ async def cancel_job_endpoint(
 @router.post("/score", response_model=RankingResponse)
 async def recalculate_score(
     request: ScoreRequest,
+    db: Database = Depends(get_db),
     session: SessionData = Depends(require_auth)
 ):
     """
     Recalculate ranking with custom weights.
+    If the latest ranking already used these weights and service groups it is returned as is.
     """
-    db = get_db()
-
-    # Get extraction data
-    extraction = db.get_extraction(request.job_id)
-    if not extraction:
-        raise HTTPException(status_code=404, detail="Extraction data not found")
-
     # Get weights
-    weights = request.weights or db.get_weights()
+    weights = request.weights or await asyncio.to_thread(db.get_weights)
 
-    # Calculate ranking
-    try:
-        ranking_data = calculate_ranking(
-            extraction,
-            weights={
-                "time": weights.time,
-                "service": weights.service,
-                "infra": weights.infra,
-                "org": weights.org
-            }
-        )
-    except Exception as e:
-        logger.exception(f"Error calculating ranking: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    # Scoring is deterministic for a given extraction, weights and service groups:
+    # reuse the latest ranking if none of them changed
+    scoring_config = await asyncio.to_thread(db.get_scoring_config_digest)
+    ranking_id = await asyncio.to_thread(
+        db.get_latest_ranking_id_for_weights, request.job_id, weights, scoring_config
+    )
 
-    # Save new ranking
-    db.save_ranking(request.job_id, weights, ranking_data)
+    if ranking_id is None:
+        # Get extraction data
+        extraction = await asyncio.to_thread(db.get_extraction, request.job_id)
+        if not extraction:
+            raise HTTPException(status_code=404, detail="Extraction data not found")
+
+        # Calculate ranking
+        try:
+            ranking_data = await asyncio.to_thread(
+                calculate_ranking,
+                extraction,
+                weights=_weights_dict(weights)
+            )
+        except Exception as e:
+            logger.exception("Error calculating ranking: %s", e)
+            raise HTTPException(status_code=500, detail=str(e))
+
+        # Save new ranking
+        ranking_id = await asyncio.to_thread(
+            db.save_ranking, request.job_id, weights, ranking_data, scoring_config
+        )
 
-    # Transform to response model
-    return _transform_ranking_response(ranking_data)
+    return Response(content=await asyncio.to_thread(_ranking_body, ranking_id, 0), media_type="application/json")
 
 
 @router.get("/{job_id}/ranking", response_model=RankingResponse)
 async def get_ranking(
     job_id: str,
-    top: int = 50,
+    request: Request,
+    top: int = Query(50, ge=0),
+    db: Database = Depends(get_db),
     session: SessionData = Depends(require_auth)
 ):
     """
     Get ranking for a job.
+    Supports conditional GET: the ETag changes whenever a new ranking is saved.
     """
-    db = get_db()
+    # Cached ranking first; the extraction is only loaded when there is none
+    ranking_id, extraction = await asyncio.to_thread(db.get_latest_ranking_id_or_extraction, job_id)
 
-    # Try to get cached ranking first
-    ranking_data = db.get_latest_ranking(job_id)
-
-    if not ranking_data:
+    if ranking_id is None:
         # Calculate ranking from extraction
-        extraction = db.get_extraction(job_id)
         if not extraction:
             raise HTTPException(status_code=404, detail="Job data not found")
 
-        weights = db.get_weights()
-        ranking_data = calculate_ranking(
+        weights = await asyncio.to_thread(db.get_weights)
+        ranking_data = await asyncio.to_thread(
+            calculate_ranking,
             extraction,
-            weights={
-                "time": weights.time,
-                "service": weights.service,
-                "infra": weights.infra,
-                "org": weights.org
-            }
+            weights=_weights_dict(weights)
         )
 
-        db.save_ranking(job_id, weights, ranking_data)
+        ranking_id = await asyncio.to_thread(db.save_ranking, job_id, weights, ranking_data)
+
+    etag = f'"r{ranking_id}-{top}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    return Response(
+        content=await asyncio.to_thread(_ranking_body, ranking_id, top),
+        media_type="application/json",
+        headers=headers
+    )
 
-    # Limit ranking
-    if top and top < len(ranking_data.get("ranking", [])):
-        ranking_data["ranking"] = ranking_data["ranking"][:top]
 
-    return _transform_ranking_response(ranking_data)
+@lru_cache(maxsize=RANKING_CACHE_SIZE)
+def _ranking_body(ranking_id: int, top: int) -> bytes:
+    """Serialized RankingResponse for a stored ranking (limited to top items)."""
+    ranking_data = get_db().get_ranking(ranking_id)
+    return _transform_ranking_response(ranking_data, top or None).model_dump_json().encode()
 
 
-@router.get("/{job_id}/teccm/{teccm_key}")
+@router.get("/{job_id}/teccm/{teccm_key}", response_model=TECCMDetailResponse)
 async def get_teccm_details(
     job_id: str,
     teccm_key: str,
+    db: Database = Depends(get_db),
+    settings: Settings = Depends(get_settings),
     session: SessionData = Depends(require_auth)
 ):
     """
     Get detailed information about a specific TECCM.
     """
-    db = get_db()
-    settings = get_settings()
-
-    extraction = db.get_extraction(job_id)
+    extraction = await asyncio.to_thread(db.get_extraction, job_id)
     if not extraction:
         raise HTTPException(status_code=404, detail="Job data not found")
 
-    weights = db.get_weights()
-    detail = get_teccm_detail(
+    weights = await asyncio.to_thread(db.get_weights)
+    detail = await asyncio.to_thread(
+        get_teccm_detail,
         extraction,
         teccm_key,
-        weights={
-            "time": weights.time,
-            "service": weights.service,
-            "infra": weights.infra,
-            "org": weights.org
-        }
+        weights=_weights_dict(weights)
     )
 
     if not detail:
@@ -415,46 +463,54 @@ async def get_teccm_details(
     return detail
 
 
-def _transform_ranking_response(ranking_data: dict) -> RankingResponse:
-    """Transform internal ranking data to API response model."""
-    from ..models import IncidentInfo, TECCMRankingItem
+def _weights_dict(weights: Weights) -> dict:
+    """Weights as the plain dict expected by the scorer."""
+    return weights.model_dump()
 
-    incident = IncidentInfo(
-        issue_key=ranking_data["incident"]["issue_key"],
-        summary=ranking_data["incident"]["summary"],
-        first_impact_time=ranking_data["incident"].get("first_impact_time"),
-        created_at=ranking_data["incident"].get("created_at"),
-        services=ranking_data["incident"].get("services", []),
-        hosts=ranking_data["incident"].get("hosts", []),
-        technologies=ranking_data["incident"].get("technologies", []),
-    )
+
+def _transform_ranking_response(ranking_data: dict, top: Optional[int] = None) -> RankingResponse:
+    """
+    Transform internal ranking data to API response model (first top items, all if None).
+    The whole response is validated with one model_validate call (a single pass
+    in pydantic-core) instead of building each item model from Python.
+    """
+    inc = ranking_data["incident"]
+    incident = {
+        "issue_key": inc["issue_key"],
+        "summary": inc["summary"],
+        "first_impact_time": inc.get("first_impact_time"),
+        "created_at": inc.get("created_at"),
+        "services": inc.get("services", ()),
+        "hosts": inc.get("hosts", ()),
+        "technologies": inc.get("technologies", ()),
+    }
 
     ranking_items = []
-    for item in ranking_data.get("ranking", []):
+    for item in islice(ranking_data.get("ranking", ()), top):
         teccm_info = item.get("teccm_info", {})
         details = item.get("details", {})
-        ranking_items.append(TECCMRankingItem(
-            rank=item["rank"],
-            issue_key=item["issue_key"],
-            summary=item["summary"],
-            final_score=item["final_score"],
-            sub_scores=item["sub_scores"],
-            details=details,
-            assignee=teccm_info.get("assignee"),
-            team=teccm_info.get("team"),
-            planned_start=teccm_info.get("planned_start"),
-            planned_end=teccm_info.get("planned_end"),
-            live_intervals=teccm_info.get("live_intervals", []),
-            resolution=teccm_info.get("resolution"),
-            services=teccm_info.get("services", []),
-            hosts=teccm_info.get("hosts", []),
-            technologies=teccm_info.get("technologies", []),
-            penalties=details.get("penalties", []),
-            bonuses=details.get("bonuses", []),
-        ))
-
-    return RankingResponse(
-        incident=incident,
-        analysis=ranking_data["analysis"],
-        ranking=ranking_items
-    )
+        ranking_items.append({
+            "rank": item["rank"],
+            "issue_key": item["issue_key"],
+            "summary": item["summary"],
+            "final_score": item["final_score"],
+            "sub_scores": item["sub_scores"],
+            "details": details,
+            "assignee": teccm_info.get("assignee"),
+            "team": teccm_info.get("team"),
+            "planned_start": teccm_info.get("planned_start"),
+            "planned_end": teccm_info.get("planned_end"),
+            "live_intervals": teccm_info.get("live_intervals", ()),
+            "resolution": teccm_info.get("resolution"),
+            "services": teccm_info.get("services", ()),
+            "hosts": teccm_info.get("hosts", ()),
+            "technologies": teccm_info.get("technologies", ()),
+            "penalties": details.get("penalties", ()),
+            "bonuses": details.get("bonuses", ()),
+        })
+
+    return RankingResponse.model_validate({
+        "incident": incident,
+        "analysis": ranking_data["analysis"],
+        "ranking": ranking_items,
+    })
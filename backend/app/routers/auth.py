@@ -3,24 +3,82 @@ Authentication router.
 Handles Jira credentials validation and session management.
 """
 
+import asyncio
+import hashlib
 import logging
-from typing import Optional
+import secrets
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
 from fastapi import APIRouter, HTTPException, Response, Request, Depends
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
-from ..config import get_settings
+from ..config import Settings, get_settings
 from ..models import LoginRequest, LoginResponse, SessionInfo
 from ..services.jira_client import JiraClient
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-# Simple in-memory session store
-# In production, use Redis or database-backed sessions
-_sessions: dict[str, dict] = {}
+# Upper bound on concurrent sessions kept in memory
+MAX_SESSIONS = 10_000
+
+
+class SessionStore:
+    """
+    In-memory session store with expiry (same lifetime as the cookie) and a size bound.
+    Entries are keyed by a hash of the session token, never the token itself.
+    In production with several workers, use Redis or database-backed sessions.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return hashlib.blake2b(session_id.encode(), digest_size=16).hexdigest()
+
+    def get(self, session_id: str) -> Optional[Any]:
+        key = self._key(session_id)
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            with self._lock:
+                self._data.pop(key, None)
+            return None
+        return entry[1]
+
+    def set(self, session_id: str, value: Any):
+        with self._lock:
+            if len(self._data) >= self.maxsize:
+                self._evict()
+            self._data[self._key(session_id)] = (time.monotonic() + self.ttl, value)
+
+    def pop(self, session_id: str):
+        with self._lock:
+            self._data.pop(self._key(session_id), None)
+
+    def _evict(self):
+        """Drop expired sessions; if still full, drop the oldest (dicts keep insertion order)."""
+        now = time.monotonic()
+        for sid in [sid for sid, (expires, _) in self._data.items() if expires <= now]:
+            del self._data[sid]
+        while len(self._data) >= self.maxsize:
+            del self._data[next(iter(self._data))]
+
+
+_sessions = SessionStore(MAX_SESSIONS, get_settings().session_expire_hours * 3600)
 
 
 class SessionData(BaseModel):
+    # Shared across requests for the lifetime of the session
+    model_config = ConfigDict(frozen=True)
+
     username: str
     password: str
     display_name: str
@@ -32,64 +90,63 @@ def get_session_id(request: Request) -> Optional[str]:
 
 
 def get_current_session(request: Request) -> Optional[SessionData]:
-    """Get current session data."""
+    """Get current session data (the stored SessionData, sessions are immutable)."""
     session_id = get_session_id(request)
-    if session_id and session_id in _sessions:
-        return SessionData(**_sessions[session_id])
-    return None
+    return _sessions.get(session_id) if session_id else None
+
+
+@lru_cache(maxsize=1)
+def _default_session(username: str, password: str) -> SessionData:
+    """Session for the default credentials from env, built once."""
+    return SessionData(username=username, password=password, display_name=username)
 
 
-def require_auth(request: Request) -> SessionData:
+def require_auth(request: Request, settings: Settings = Depends(get_settings)) -> SessionData:
     """Dependency that requires authentication."""
     session = get_current_session(request)
     if not session:
         # Check for default credentials from env
-        settings = get_settings()
         if settings.jira_user and settings.jira_password:
-            return SessionData(
-                username=settings.jira_user,
-                password=settings.jira_password,
-                display_name=settings.jira_user
-            )
+            return _default_session(settings.jira_user, settings.jira_password)
         raise HTTPException(status_code=401, detail="Not authenticated")
     return session
 
 
 @router.post("/login", response_model=LoginResponse)
-async def login(request: LoginRequest, response: Response):
+async def login(request: LoginRequest, response: Response, settings: Settings = Depends(get_settings)):
     """
     Validate Jira credentials and create session.
     """
-    logger.info(f"Login attempt for user: {request.username}")
+    logger.info("Login attempt for user: %s", request.username)
 
     # Try to connect to Jira
+    # connect() is a blocking Jira round-trip; keep it off the event loop
     client = JiraClient(request.username, request.password)
-    success, message = client.connect()
+    success, message = await asyncio.to_thread(client.connect)
 
     if not success:
-        logger.warning(f"Login failed for {request.username}: {message}")
+        logger.warning("Login failed for %s: %s", request.username, message)
         raise HTTPException(status_code=401, detail=message)
 
     # Create session
-    import uuid
-    session_id = str(uuid.uuid4())
+    session_id = secrets.token_urlsafe(24)
 
-    _sessions[session_id] = {
-        "username": request.username,
-        "password": request.password,  # Needed for Jira API calls
-        "display_name": request.username,
-    }
+    _sessions.set(session_id, SessionData(
+        username=request.username,
+        password=request.password,  # Needed for Jira API calls
+        display_name=request.username,
+    ))
 
     # Set session cookie
     response.set_cookie(
         key="session_id",
         value=session_id,
         httponly=True,
-        max_age=get_settings().session_expire_hours * 3600,
+        max_age=settings.session_expire_hours * 3600,
         samesite="lax"
     )
 
-    logger.info(f"Login successful for {request.username}")
+    logger.info("Login successful for %s", request.username)
 
     return LoginResponse(
         success=True,
@@ -104,8 +161,8 @@ async def logout(request: Request, response: Response):
     Clear session and logout.
     """
     session_id = get_session_id(request)
-    if session_id and session_id in _sessions:
-        del _sessions[session_id]
+    if session_id:
+        _sessions.pop(session_id)
 
     response.delete_cookie("session_id")
 
@@ -113,11 +170,10 @@ async def logout(request: Request, response: Response):
 
 
 @router.get("/session", response_model=SessionInfo)
-async def get_session(request: Request):
+async def get_session(request: Request, settings: Settings = Depends(get_settings)):
     """
     Get current session info.
     """
-    settings = get_settings()
     session = get_current_session(request)
 
     if session:
@@ -3,7 +3,13 @@ Configuration router.
 Handles weights and other settings.
 """
 
-from fastapi import APIRouter, Depends
+import asyncio
+import secrets
+from typing import Callable, Dict, Tuple
+
+from pydantic import BaseModel
+
+from fastapi import APIRouter, Depends, Request, Response
 
 from ..models import (
     Weights, WeightsConfig, WeightsUpdateRequest,
@@ -12,133 +18,166 @@ from ..models import (
     ServiceGroupsResponse, ServiceGroupsUpdateRequest,
     ServiceMappingsResponse
 )
-from ..db.storage import get_db
-from ..routers.auth import require_auth, SessionData
+from ..config import Settings, get_settings
+from ..db.storage import Database, get_db
+from ..routers.auth import require_auth
+
+# Every config endpoint requires an authenticated session
+router = APIRouter(prefix="/config", tags=["config"], dependencies=[Depends(require_auth)])
 
-router = APIRouter(prefix="/config", tags=["config"])
+# Default values used by the reset endpoints (never mutated, built once)
+_DEFAULT_WEIGHTS = Weights()
+_DEFAULT_PENALTIES = Penalties()
+_DEFAULT_BONUSES = Bonuses()
+_DEFAULT_THRESHOLDS = Thresholds()
+
+# Distinguishes ETags across restarts (the config version counter starts at 0)
+_ETAG_PREFIX = secrets.token_hex(4)
+
+# Serialized GET bodies per endpoint, tagged with the config version they were built from
+_body_cache: Dict[str, Tuple[int, bytes]] = {}
+
+
+async def _config_response(key: str, request: Request, db: Database, build: Callable[[], BaseModel]) -> Response:
+    """
+    Conditional GET for config endpoints: 304 if the client already has the
+    current config version, otherwise the body serialized once per version.
+    Only a cache miss reaches the database, in a worker thread.
+    """
+    version = db.config_version
+    etag = f'W/"{_ETAG_PREFIX}-{version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    entry = _body_cache.get(key)
+    if entry is None or entry[0] != version:
+        model = await asyncio.to_thread(build)
+        entry = (version, model.model_dump_json().encode())
+        _body_cache[key] = entry
+    return Response(content=entry[1], media_type="application/json", headers=headers)
 
 
 @router.get("/weights", response_model=WeightsConfig)
-async def get_weights(session: SessionData = Depends(require_auth)):
+async def get_weights(
+    request: Request,
+    db: Database = Depends(get_db)
+):
     """
     Get current default weights.
     """
-    db = get_db()
-    weights = db.get_weights()
-
-    return WeightsConfig(weights=weights)
+    return await _config_response(
+        "weights", request, db, lambda: WeightsConfig(weights=db.get_weights())
+    )
 
 
 @router.put("/weights", response_model=WeightsConfig)
 async def update_weights(
     request: WeightsUpdateRequest,
-    session: SessionData = Depends(require_auth)
+    db: Database = Depends(get_db)
 ):
     """
     Update default weights.
     """
-    db = get_db()
-    current = db.get_weights()
+    current = await asyncio.to_thread(db.get_weights)
 
     # Update only provided fields
-    new_weights = Weights(
-        time=request.time if request.time is not None else current.time,
-        service=request.service if request.service is not None else current.service,
-        infra=request.infra if request.infra is not None else current.infra,
-        org=request.org if request.org is not None else current.org,
-    )
+    merged = current.model_dump()
+    merged.update(request.model_dump(exclude_none=True))
+    new_weights = Weights(**merged)
 
-    db.set_weights(new_weights)
+    # Unchanged weights: skip the write (and the config version bump)
+    if new_weights != current:
+        await asyncio.to_thread(db.set_weights, new_weights)
 
     return WeightsConfig(weights=new_weights)
 
 
 @router.post("/weights/reset", response_model=WeightsConfig)
-async def reset_weights(session: SessionData = Depends(require_auth)):
+async def reset_weights(
+    db: Database = Depends(get_db)
+):
     """
     Reset weights to default values.
     """
-    db = get_db()
-    default_weights = Weights()
-    db.set_weights(default_weights)
+    await asyncio.to_thread(db.set_weights, _DEFAULT_WEIGHTS)
 
-    return WeightsConfig(weights=default_weights)
+    return WeightsConfig(weights=_DEFAULT_WEIGHTS)
 
 
 @router.get("/app", response_model=AppConfig)
-async def get_app_config(session: SessionData = Depends(require_auth)):
+async def get_app_config(
+    request: Request,
+    db: Database = Depends(get_db)
+):
     """
     Get all app configuration.
     """
-    db = get_db()
-    return AppConfig(
-        weights=db.get_weights(),
-        penalties=db.get_penalties(),
-        bonuses=db.get_bonuses(),
-        thresholds=db.get_thresholds(),
-        top_results=db.get_top_results()
-    )
+    def build():
+        weights, penalties, bonuses, thresholds, top_results = db.get_app_config_bundle()
+        return AppConfig(
+            weights=weights,
+            penalties=penalties,
+            bonuses=bonuses,
+            thresholds=thresholds,
+            top_results=top_results
+        )
+
+    return await _config_response("app", request, db, build)
 
 
 @router.put("/app", response_model=AppConfig)
 async def update_app_config(
     request: AppConfigUpdateRequest,
-    session: SessionData = Depends(require_auth)
+    db: Database = Depends(get_db)
 ):
     """
     Update app configuration.
+    The response is built from the current values overlaid with the request (no re-read).
     """
-    db = get_db()
-
-    if request.weights:
-        db.set_weights(request.weights)
-
-    if request.penalties:
-        db.set_penalties(request.penalties)
-
-    if request.bonuses:
-        db.set_bonuses(request.bonuses)
-
-    if request.thresholds:
-        db.set_thresholds(request.thresholds)
-
-    if request.top_results is not None:
-        db.set_top_results(request.top_results)
+    weights, penalties, bonuses, thresholds, top_results = await asyncio.to_thread(db.get_app_config_bundle)
+
+    # All provided sections are written in a single transaction
+    await asyncio.to_thread(
+        db.set_app_config,
+        weights=request.weights,
+        penalties=request.penalties,
+        bonuses=request.bonuses,
+        thresholds=request.thresholds,
+        top_results=request.top_results
+    )
 
     return AppConfig(
-        weights=db.get_weights(),
-        penalties=db.get_penalties(),
-        bonuses=db.get_bonuses(),
-        thresholds=db.get_thresholds(),
-        top_results=db.get_top_results()
+        weights=request.weights or weights,
+        penalties=request.penalties or penalties,
+        bonuses=request.bonuses or bonuses,
+        thresholds=request.thresholds or thresholds,
+        top_results=top_results if request.top_results is None else request.top_results
     )
 
 
 @router.post("/app/reset", response_model=AppConfig)
-async def reset_app_config(session: SessionData = Depends(require_auth)):
+async def reset_app_config(
+    db: Database = Depends(get_db),
+    settings: Settings = Depends(get_settings)
+):
     """
     Reset all config to defaults.
     """
-    db = get_db()
-    from ..config import get_settings
-    settings = get_settings()
-
-    default_weights = Weights()
-    default_penalties = Penalties()
-    default_bonuses = Bonuses()
-    default_thresholds = Thresholds()
-
-    db.set_weights(default_weights)
-    db.set_penalties(default_penalties)
-    db.set_bonuses(default_bonuses)
-    db.set_thresholds(default_thresholds)
-    db.set_top_results(settings.default_top_results)
+    await asyncio.to_thread(
+        db.set_app_config,
+        weights=_DEFAULT_WEIGHTS,
+        penalties=_DEFAULT_PENALTIES,
+        bonuses=_DEFAULT_BONUSES,
+        thresholds=_DEFAULT_THRESHOLDS,
+        top_results=settings.default_top_results
+    )
 
     return AppConfig(
-        weights=default_weights,
-        penalties=default_penalties,
-        bonuses=default_bonuses,
-        thresholds=default_thresholds,
+        weights=_DEFAULT_WEIGHTS,
+        penalties=_DEFAULT_PENALTIES,
+        bonuses=_DEFAULT_BONUSES,
+        thresholds=_DEFAULT_THRESHOLDS,
         top_results=settings.default_top_results
     )
 
@@ -148,80 +187,102 @@ async def reset_app_config(session: SessionData = Depends(require_auth)):
 # ══════════════════════════════════════════════════════════════════════════════
 
 @router.get("/mappings", response_model=ServiceMappingsResponse)
-async def get_service_mappings(session: SessionData = Depends(require_auth)):
+async def get_service_mappings(
+    request: Request,
+    db: Database = Depends(get_db)
+):
     """
     Get all service mappings (synonyms and groups).
+    Preferred over the individual GET /mappings/synonyms and /mappings/groups.
     """
-    db = get_db()
-    return ServiceMappingsResponse(
-        synonyms=db.get_service_synonyms(),
-        groups=db.get_service_groups()
-    )
+    def build():
+        synonyms, groups = db.get_service_mappings_bundle()
+        return ServiceMappingsResponse(synonyms=synonyms, groups=groups)
+
+    return await _config_response("mappings", request, db, build)
 
 
-@router.get("/mappings/synonyms", response_model=ServiceSynonymsResponse)
-async def get_service_synonyms(session: SessionData = Depends(require_auth)):
+@router.get("/mappings/synonyms", response_model=ServiceSynonymsResponse, deprecated=True)
+async def get_service_synonyms(
+    request: Request,
+    db: Database = Depends(get_db)
+):
     """
     Get service synonyms mapping.
     Maps canonical service names to their aliases.
     """
-    db = get_db()
-    return ServiceSynonymsResponse(synonyms=db.get_service_synonyms())
+    return await _config_response(
+        "synonyms", request, db, lambda: ServiceSynonymsResponse(synonyms=db.get_service_synonyms())
+    )
 
 
 @router.put("/mappings/synonyms", response_model=ServiceSynonymsResponse)
 async def update_service_synonyms(
     request: ServiceSynonymsUpdateRequest,
-    session: SessionData = Depends(require_auth)
+    db: Database = Depends(get_db)
 ):
     """
     Update service synonyms mapping.
     Replaces the entire mapping with the provided data.
     """
-    db = get_db()
-    db.set_service_synonyms(request.synonyms)
-    return ServiceSynonymsResponse(synonyms=db.get_service_synonyms())
+    current = await asyncio.to_thread(db.get_service_synonyms)
+    if request.synonyms == current:
+        return ServiceSynonymsResponse(synonyms=current)
+
+    await asyncio.to_thread(db.set_service_synonyms, request.synonyms)
+    # An empty map falls back to the defaults on read
+    return ServiceSynonymsResponse(synonyms=request.synonyms or await asyncio.to_thread(db.get_service_synonyms))
 
 
 @router.post("/mappings/synonyms/reset", response_model=ServiceSynonymsResponse)
-async def reset_service_synonyms(session: SessionData = Depends(require_auth)):
+async def reset_service_synonyms(
+    db: Database = Depends(get_db)
+):
     """
     Reset service synonyms to defaults.
     """
-    db = get_db()
-    db.reset_service_synonyms()
-    return ServiceSynonymsResponse(synonyms=db.get_service_synonyms())
+    await asyncio.to_thread(db.reset_service_synonyms)
+    return ServiceSynonymsResponse(synonyms=await asyncio.to_thread(db.get_service_synonyms))
 
 
-@router.get("/mappings/groups", response_model=ServiceGroupsResponse)
-async def get_service_groups(session: SessionData = Depends(require_auth)):
+@router.get("/mappings/groups", response_model=ServiceGroupsResponse, deprecated=True)
+async def get_service_groups(
+    request: Request,
+    db: Database = Depends(get_db)
+):
     """
     Get related service groups.
     Maps ecosystem names to services that belong to that ecosystem.
     """
-    db = get_db()
-    return ServiceGroupsResponse(groups=db.get_service_groups())
+    return await _config_response(
+        "groups", request, db, lambda: ServiceGroupsResponse(groups=db.get_service_groups())
+    )
 
 
 @router.put("/mappings/groups", response_model=ServiceGroupsResponse)
 async def update_service_groups(
     request: ServiceGroupsUpdateRequest,
-    session: SessionData = Depends(require_auth)
+    db: Database = Depends(get_db)
 ):
     """
     Update service groups mapping.
     Replaces the entire mapping with the provided data.
     """
-    db = get_db()
-    db.set_service_groups(request.groups)
-    return ServiceGroupsResponse(groups=db.get_service_groups())
+    current = await asyncio.to_thread(db.get_service_groups)
+    if request.groups == current:
+        return ServiceGroupsResponse(groups=current)
+
+    await asyncio.to_thread(db.set_service_groups, request.groups)
+    # An empty map falls back to the defaults on read
+    return ServiceGroupsResponse(groups=request.groups or await asyncio.to_thread(db.get_service_groups))
 
 
 @router.post("/mappings/groups/reset", response_model=ServiceGroupsResponse)
-async def reset_service_groups(session: SessionData = Depends(require_auth)):
+async def reset_service_groups(
+    db: Database = Depends(get_db)
+):
     """
     Reset service groups to defaults.
     """
-    db = get_db()
-    db.reset_service_groups()
-    return ServiceGroupsResponse(groups=db.get_service_groups())
+    await asyncio.to_thread(db.reset_service_groups)
+    return ServiceGroupsResponse(groups=await asyncio.to_thread(db.get_service_groups))
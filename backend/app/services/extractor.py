@@ -4,10 +4,14 @@ Adaptado de jira_extractor.py para uso como servicio.
 """
 
 import re
+import hashlib
 import logging
 import time
 import threading
+from collections import Counter, OrderedDict
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import chain
 from typing import Optional, Dict, Any, List, Tuple, Callable
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
@@ -23,6 +27,9 @@ DEFAULT_THREADS = 8
 MAX_RETRIES = 3
 RETRY_DELAY_BASE = 2  # segundos, se multiplica exponencialmente
 
+# Resultados de hosts/tecnologías por texto (re-extracciones del mismo ticket)
+TEXT_ENTITY_CACHE_SIZE = 2048
+
 # ══════════════════════════════════════════════════════════════════════════════
 #  MAPEOS Y PATRONES
 # ══════════════════════════════════════════════════════════════════════════════
@@ -97,6 +104,18 @@ TECHNOLOGIES = [
     "keycloak", "iam", "oauth", "ldap", "saml", "openid",
 ]
 
+# Tecnologías de una sola palabra: con \b a ambos lados solo coinciden con una palabra
+# completa del texto, así que basta con intersectar con el conjunto de palabras
+WORD_PATTERN = re.compile(r'\w+')
+WORD_TECHNOLOGIES = frozenset(t for t in TECHNOLOGIES if WORD_PATTERN.fullmatch(t))
+
+# El resto (p.ej. hyper-v) se busca con una sola alternación (las más largas primero)
+MULTIWORD_TECHNOLOGY_PATTERN = re.compile(
+    r'\b(?:' + '|'.join(
+        re.escape(t) for t in sorted(set(TECHNOLOGIES) - WORD_TECHNOLOGIES, key=len, reverse=True)
+    ) + r')\b'
+)
+
 # Sinónimos de servicios conocidos (defaults)
 DEFAULT_SERVICE_SYNONYMS = {
     "customer area": ["adc", "area de clientes", "customer system", "arsys customer panel", "área de clientes"],
@@ -138,9 +157,25 @@ HOST_PATTERNS = [
     re.compile(r'\b([a-z]{6,30}[a-z]\d{2})\b', re.IGNORECASE),
 ]
 
+# Tokens (letras, dígitos, guiones) con al menos un dígito: todo host matchea dentro
+# de uno de ellos, así que HOST_PATTERNS solo necesita recorrer esos tokens
+HOST_CANDIDATE_PATTERN = re.compile(r'(?<![\w-])(?:[^\W\d]|-)*+\d[\w-]*+')
+
 # Patrones para filtrar falsos positivos
 UUID_FRAGMENT_PATTERN = re.compile(r'^[a-f0-9]{4,8}$', re.IGNORECASE)
 HEX_HASH_PATTERN = re.compile(r'^[a-f0-9]{32,}$', re.IGNORECASE)
+LETTER_PATTERN = re.compile(r'[^\W\d_]')  # cualquier letra (equivale a str.isalpha por carácter)
+HOST_REJECT_PATTERN = re.compile(r"""
+    ^(?:
+        (?:
+            v?\d+(?:\.\d+)*                                               # versiones: v1, v2, 8.1.3
+          | node-\d+                                                      # fragmentos incompletos de s3-node-*
+          | (?:eu|us|ap|sa|af|me)-(?:north|south|east|west|central)-\d+   # regiones cloud: eu-south-2
+          | (?!s3-node)[a-z]{2,6}-\d{1,5}                                 # IDs Jira: icrd-141, s3-123 (no s3-node-123)
+        )$
+      | (?:image|screenshot|img|pic|photo)-                               # imágenes adjuntas: image-2025-11-18
+    )
+""", re.VERBOSE)
 
 # Palabras que no son hosts aunque matcheen el patrón
 HOST_BLACKLIST = {
@@ -161,6 +196,32 @@ TIMELINE_PATTERN = re.compile(
     re.MULTILINE
 )
 
+# Prefijos de Business Unit (ordenados por especificidad): (patrón, grupo con el servicio)
+BU_PREFIX_PATTERNS = [
+    # Formato con underscore: AR_xxx, FH_xxx
+    (re.compile(r'^ar_(.+)$'), 1),
+    (re.compile(r'^fh_(.+)$'), 1),
+
+    # Formato con guión: IC-xxx, IONOS-xxx, Strato-xxx
+    (re.compile(r'^ic-(.+)$'), 1),
+    (re.compile(r'^ionos-(.+)$'), 1),
+    (re.compile(r'^strato-(.+)$'), 1),
+    (re.compile(r'^home\.pl-(.+)$'), 1),
+
+    # Formatos de otras marcas
+    (re.compile(r'^cronon[- ](.+)$'), 1),
+    (re.compile(r'^fasthosts[- ](.+)$'), 1),
+    (re.compile(r'^world4you[- ](.+)$'), 1),
+    (re.compile(r'^internetx[- ](.+)$'), 1),
+    (re.compile(r'^we22[- ](.+)$'), 1),
+    (re.compile(r'^udag[- ](.+)$'), 1),
+
+    # Formato con paréntesis: Next Generation Cloud Server (NGCS)
+    (re.compile(r'^(.+?)\s*\(([A-Za-z]{2,10}(?:-[A-Za-z]{2,10})?)\)$'), 2),
+]
+TRAILING_PARENS_PATTERN = re.compile(r'\s*\([^)]*\)\s*$')
+WINDOW_PATTERN = re.compile(r'^(\d+)([hdm])$')
+
 
 # ══════════════════════════════════════════════════════════════════════════════
 #  FUNCIONES DE UTILIDAD
@@ -170,12 +231,12 @@ def safe_get(obj, attr, default=None):
     """Obtiene un atributo de forma segura."""
     if obj is None:
         return default
-    return getattr(obj, attr, default) if hasattr(obj, attr) else default
+    return getattr(obj, attr, default)
 
 
 def parse_window(window_str: str) -> timedelta:
     """Parsea una ventana temporal como '2h', '2d', '120m'."""
-    match = re.match(r'^(\d+)([hdm])$', window_str.lower())
+    match = WINDOW_PATTERN.match(window_str.lower())
     if not match:
         raise ValueError(f"Formato de ventana inválido: {window_str}")
 
@@ -193,6 +254,26 @@ def normalize_datetime(dt_str: str) -> Optional[str]:
     """Normaliza una fecha de Jira a formato ISO."""
     if not dt_str:
         return None
+    if not isinstance(dt_str, str):
+        # Valores no-string de campos custom: strptime fallaría, se devuelven tal cual
+        return dt_str
+    return _normalize_datetime_str(dt_str)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_datetime_str(dt_str: str) -> str:
+    """normalize_datetime para strings, memoizada (las fechas se repiten entre tickets)."""
+    head = dt_str[:19]
+    # Formato habitual de Jira (2024-01-15T10:30:00.000+0100): ya está normalizado,
+    # fromisoformat solo valida la fecha y es mucho más rápido que strptime.
+    # Años < 1000 quedan fuera: strftime no los rellena con ceros.
+    if (len(head) == 19 and head[0] != '0' and head[4] == '-' and head[7] == '-'
+            and head[10] == 'T' and head[13] == ':' and head[16] == ':'):
+        try:
+            datetime.fromisoformat(head)
+            return head + 'Z'
+        except ValueError:
+            pass
     try:
         dt = datetime.strptime(dt_str[:19], "%Y-%m-%dT%H:%M:%S")
         return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -204,7 +285,11 @@ def parse_interval_date(date_str: str, time_str: str, reference_date: str = None
     """Parsea fecha y hora de un intervalo a ISO format."""
     try:
         if date_str:
-            dt = datetime.strptime(f"{date_str} {time_str}", "%d/%m/%Y %H:%M")
+            # dd/mm/YYYY y HH:MM de ancho fijo (validados por INTERVAL_PATTERN): sin strptime
+            dt = datetime(
+                int(date_str[6:10]), int(date_str[3:5]), int(date_str[0:2]),
+                int(time_str[0:2]), int(time_str[3:5])
+            )
         elif reference_date:
             ref = datetime.strptime(reference_date, "%d/%m/%Y")
             time = datetime.strptime(time_str, "%H:%M")
@@ -220,6 +305,7 @@ def parse_interval_date(date_str: str, time_str: str, reference_date: str = None
 #  EXTRACTORES ESPECÍFICOS
 # ══════════════════════════════════════════════════════════════════════════════
 
+@lru_cache(maxsize=4096)
 def is_valid_host(hostname: str) -> bool:
     """Valida si un string es un hostname válido (no UUID, no hash, no blacklist)."""
     hostname = hostname.lower().strip()
@@ -240,82 +326,77 @@ def is_valid_host(hostname: str) -> bool:
     if hostname.replace('-', '').isdigit():
         return False
 
-    # Filtrar patrones de versiones: v1, v2, 8.1.3, etc
-    if re.match(r'^v?\d+(\.\d+)*$', hostname):
-        return False
-
     # Debe tener al menos una letra
-    if not any(c.isalpha() for c in hostname):
+    if not LETTER_PATTERN.search(hostname):
         return False
 
-    # Filtrar fragmentos incompletos de s3-node-*
-    if re.match(r'^node-\d+$', hostname):
-        return False
-
-    # Filtrar regiones cloud (eu-south-2, us-east-1, etc.)
-    if re.match(r'^(eu|us|ap|sa|af|me)-(north|south|east|west|central)-\d+$', hostname):
-        return False
-
-    # Filtrar IDs de tickets Jira: icrd-141, s3-123, ngcs-456 (pero NO s3-node-123)
-    if re.match(r'^[a-z]{2,6}-\d{1,5}$', hostname) and not hostname.startswith('s3-node'):
-        return False
-
-    # Filtrar nombres de imágenes adjuntas: image-2025-11-18, screenshot-1
-    if re.match(r'^(image|screenshot|img|pic|photo)-', hostname):
+    # Filtrar versiones, fragmentos de s3-node-*, regiones cloud, IDs Jira e imágenes
+    if HOST_REJECT_PATTERN.match(hostname):
         return False
 
     return True
 
 
-def extract_hosts(text: str) -> List[str]:
-    """Extrae hostnames del texto usando múltiples patrones."""
+def extract_hosts(text: str, *, is_lower: bool = False) -> List[str]:
+    """Extrae hostnames del texto usando múltiples patrones (is_lower: texto ya en minúsculas)."""
     if not text:
         return []
 
-    text_lower = text.lower()
+    # Un único recorrido del texto completo; los patrones se aplican sobre los
+    # tokens candidatos separados por espacios (mismos límites de palabra)
+    candidates = ' '.join(HOST_CANDIDATE_PATTERN.findall(text if is_lower else text.lower()))
+    if not candidates:
+        return []
     all_matches = set()
 
     # Aplicar todos los patrones
     for pattern in HOST_PATTERNS:
-        matches = pattern.findall(text_lower)
+        matches = pattern.findall(candidates)
         all_matches.update(matches)
 
-    # Filtrar falsos positivos
-    valid_hosts = [h for h in all_matches if is_valid_host(h)]
+    # Filtrar falsos positivos (all_matches ya no tiene duplicados)
+    return [h for h in all_matches if is_valid_host(h)]
 
-    return list(set(valid_hosts))
 
-
-def extract_technologies(text: str) -> List[str]:
-    """Extrae tecnologías conocidas del texto."""
+def extract_technologies(text: str, *, is_lower: bool = False) -> List[str]:
+    """Extrae tecnologías conocidas del texto (is_lower: texto ya en minúsculas)."""
     if not text:
         return []
-    text_lower = text.lower()
-    found = []
-    for tech in TECHNOLOGIES:
-        if re.search(rf'\b{re.escape(tech)}\b', text_lower):
-            found.append(tech)
-    return list(set(found))
-
-
-def is_valid_service_tag(tag: str) -> bool:
-    """Valida si un tag entre corchetes es un servicio válido."""
-    tag = tag.strip()
-    if tag.startswith('~'):
-        return False
-    if re.match(r'\d{2}/\d{2}/\d{4}', tag):
-        return False
-    if tag.startswith('http') or '.com' in tag or '.org' in tag:
-        return False
-    if tag.startswith('!') or tag.endswith('!'):
-        return False
-    if len(tag) < 2:
-        return False
-    if tag.replace(' ', '').replace(':', '').replace(',', '').isdigit():
-        return False
-    return True
+    text_lower = text if is_lower else text.lower()
+    found = set(WORD_PATTERN.findall(text_lower))
+    found.intersection_update(WORD_TECHNOLOGIES)
+    found.update(MULTIWORD_TECHNOLOGY_PATTERN.findall(text_lower))
+    return list(found)
+
+
+# Clave: digest del texto (no se retiene el texto completo en memoria)
+_text_entity_cache: "OrderedDict[bytes, Tuple[Tuple[str, ...], Tuple[str, ...]]]" = OrderedDict()
+_text_entity_lock = threading.Lock()
+
+
+def extract_text_entities(text_lower: str) -> Tuple[List[str], List[str]]:
+    """
+    Hosts y tecnologías de un texto ya en minúsculas, memoizados por su hash.
+    Los servicios no se cachean: dependen de los sinónimos configurables.
+    """
+    key = hashlib.blake2b(text_lower.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+    with _text_entity_lock:
+        cached = _text_entity_cache.get(key)
+        if cached is not None:
+            _text_entity_cache.move_to_end(key)
+    if cached is None:
+        cached = (
+            tuple(extract_hosts(text_lower, is_lower=True)),
+            tuple(extract_technologies(text_lower, is_lower=True)),
+        )
+        with _text_entity_lock:
+            _text_entity_cache[key] = cached
+            if len(_text_entity_cache) > TEXT_ENTITY_CACHE_SIZE:
+                _text_entity_cache.popitem(last=False)
+    return list(cached[0]), list(cached[1])
 
 
+@lru_cache(maxsize=4096)
 def parse_business_unit(bu: str) -> Optional[str]:
     """
     Parsea un Business Unit y extrae el nombre del servicio.
@@ -336,37 +417,10 @@ def parse_business_unit(bu: str) -> Optional[str]:
     bu = bu.strip()
     bu_lower = bu.lower()
 
-    # Patrones de prefijos conocidos (ordenados por especificidad)
-    PREFIX_PATTERNS = [
-        # Formato con underscore: AR_xxx, FH_xxx
-        (r'^ar_(.+)$', None),
-        (r'^fh_(.+)$', None),
-
-        # Formato con guión: IC-xxx, IONOS-xxx, Strato-xxx
-        (r'^ic-(.+)$', None),
-        (r'^ionos-(.+)$', None),
-        (r'^strato-(.+)$', None),
-        (r'^home\.pl-(.+)$', None),
-
-        # Formatos de otras marcas
-        (r'^cronon[- ](.+)$', None),
-        (r'^fasthosts[- ](.+)$', None),
-        (r'^world4you[- ](.+)$', None),
-        (r'^internetx[- ](.+)$', None),
-        (r'^we22[- ](.+)$', None),
-        (r'^udag[- ](.+)$', None),
-
-        # Formato con paréntesis: Next Generation Cloud Server (NGCS)
-        (r'^(.+?)\s*\(([A-Za-z]{2,10}(?:-[A-Za-z]{2,10})?)\)$', 2),
-    ]
-
-    for pattern, group_idx in PREFIX_PATTERNS:
-        match = re.match(pattern, bu_lower)
+    for pattern, group_idx in BU_PREFIX_PATTERNS:
+        match = pattern.match(bu_lower)
         if match:
-            if group_idx is not None:
-                service = match.group(group_idx)
-            else:
-                service = match.group(1)
+            service = match.group(group_idx)
             return service.replace('_', ' ').strip()
 
     # Buscar formato jerárquico: "IONOS Cloud/IONOS Cloud PSS/IC-S3 Object Storage"
@@ -394,7 +448,7 @@ def parse_business_unit(bu: str) -> Optional[str]:
     for suffix in GENERIC_SUFFIXES:
         if result.endswith(suffix):
             result = result[:-len(suffix)].strip()
-            result = re.sub(r'\s*\([^)]*\)\s*$', '', result).strip()
+            result = TRAILING_PARENS_PATTERN.sub('', result).strip()
             break
 
     if result and len(result) >= 2:
@@ -406,39 +460,20 @@ def parse_business_unit(bu: str) -> Optional[str]:
     return None
 
 
-def extract_services(text: str, business_units: List[str] = None) -> List[str]:
-    """Extrae servicios del texto y business units."""
+def extract_services(text: str, business_units: List[str] = None, *, is_lower: bool = False) -> List[str]:
+    """Extrae servicios del texto y business units (is_lower: texto ya en minúsculas)."""
     services = set()
-    IGNORE_TAGS = {
-        'ai', 'dev', 'smb', 'urgent', 'qa', 'prod', 'pre', 'test',
-        'wip', 'todo', 'done', 'blocked', 'review',
-        'minor', 'major', 'critical', 'blocker',
-        'bug', 'feature', 'task', 'story', 'epic',
-    }
 
     # Load synonyms from DB (or defaults)
     synonyms = get_service_synonyms()
 
     if text:
-        text_lower = text.lower()
+        # Los tags entre corchetes ([Mail], [IC-S3]) son parte del texto, así que
+        # esta búsqueda ya cubre cualquier servicio que nombren
+        text_lower = text if is_lower else text.lower()
         for canonical, aliases in synonyms.items():
-            if canonical in text_lower:
+            if canonical in text_lower or any(alias in text_lower for alias in aliases):
                 services.add(canonical)
-            for alias in aliases:
-                if alias in text_lower:
-                    services.add(canonical)
-
-        tags = re.findall(r'\[([^\]]+)\]', text)
-        for tag in tags:
-            if not is_valid_service_tag(tag):
-                continue
-            tag_lower = tag.lower().strip()
-            if tag_lower in IGNORE_TAGS:
-                continue
-            for canonical, aliases in synonyms.items():
-                if canonical in tag_lower or any(a in tag_lower for a in aliases):
-                    services.add(canonical)
-                    break
 
     if business_units:
         for bu in business_units:
@@ -477,7 +512,11 @@ def extract_timeline_entries(description: str) -> List[Dict]:
     for match in matches:
         date_str, time_str, user, action = match
         try:
-            dt = datetime.strptime(f"{date_str} {time_str}", "%Y%m%d %H:%M")
+            # YYYYMMDD y HH:MM de ancho fijo (validados por TIMELINE_PATTERN): sin strptime
+            dt = datetime(
+                int(date_str[0:4]), int(date_str[4:6]), int(date_str[6:8]),
+                int(time_str[0:2]), int(time_str[3:5])
+            )
             entries.append({
                 "timestamp": dt.strftime("%Y-%m-%dT%H:%M:%SZ"),
                 "user": user.lower(),
@@ -488,8 +527,8 @@ def extract_timeline_entries(description: str) -> List[Dict]:
     return entries
 
 
-def extract_first_impact_time(description: str, timeline_entries: List[Dict]) -> Optional[str]:
-    """Determina el momento del primer impacto."""
+def extract_first_impact_time(timeline_entries: List[Dict]) -> Optional[str]:
+    """Determina el momento del primer impacto (timeline ya parseado de la descripción)."""
     if timeline_entries:
         return timeline_entries[0].get('timestamp')
     return None
@@ -532,6 +571,22 @@ def extract_people_involved(issue_data: Dict, comments: List[Dict], timeline_ent
     return list(people)
 
 
+_MISSING = object()
+
+
+def _jira_resource_value(obj):
+    """name o value de un objeto de Jira (opción, usuario); _MISSING si no tiene ninguno."""
+    # Un solo acceso por atributo (hasattr + getattr eran dos)
+    try:
+        return obj.name
+    except AttributeError:
+        pass
+    try:
+        return obj.value
+    except AttributeError:
+        return _MISSING
+
+
 def get_custom_field_value(fields, field_key: str):
     """Obtiene el valor de un campo custom."""
     jira_field = CUSTOM_FIELDS.get(field_key)
@@ -543,18 +598,16 @@ def get_custom_field_value(fields, field_key: str):
     if value is None:
         return None
 
-    if hasattr(value, 'name'):
-        return value.name
-    if hasattr(value, 'value'):
-        return value.value
+    resource_value = _jira_resource_value(value)
+    if resource_value is not _MISSING:
+        return resource_value
 
     if isinstance(value, list):
         result = []
         for item in value:
-            if hasattr(item, 'name'):
-                result.append(item.name)
-            elif hasattr(item, 'value'):
-                result.append(item.value)
+            resource_value = _jira_resource_value(item)
+            if resource_value is not _MISSING:
+                result.append(resource_value)
             elif isinstance(item, str):
                 result.append(item)
             elif isinstance(item, dict):
@@ -568,11 +621,20 @@ def get_custom_field_value(fields, field_key: str):
 #  EXTRACTOR PRINCIPAL
 # ══════════════════════════════════════════════════════════════════════════════
 
+# Campos que lee extract_ticket: issue y comentarios en una sola petición
+TICKET_FIELDS = ','.join([
+    'summary', 'description', 'comment', 'issuetype', 'labels',
+    'created', 'updated', 'resolutiondate', 'resolution',
+    'assignee', 'reporter',
+    *CUSTOM_FIELDS.values(),
+])
+
+
 def extract_ticket(jira: JIRA, issue_key: str) -> Optional[Dict[str, Any]]:
     """Extrae y normaliza un ticket de Jira."""
     try:
         logger.info(f"Extracting: {issue_key}")
-        issue = jira.issue(issue_key, expand='changelog')
+        issue = jira.issue(issue_key, fields=TICKET_FIELDS)
         fields = issue.fields
 
         issue_type = safe_get(safe_get(fields, 'issuetype'), 'name', '')
@@ -585,7 +647,7 @@ def extract_ticket(jira: JIRA, issue_key: str) -> Optional[Dict[str, Any]]:
 
         comments = []
         try:
-            for comment in jira.comments(issue_key):
+            for comment in safe_get(safe_get(fields, 'comment'), 'comments') or []:
                 comments.append({
                     'id': comment.id,
                     'author': safe_get(safe_get(comment, 'author'), 'displayName', 'Unknown'),
@@ -597,8 +659,8 @@ def extract_ticket(jira: JIRA, issue_key: str) -> Optional[Dict[str, Any]]:
 
         summary = safe_get(fields, 'summary', '')
         description = safe_get(fields, 'description', '')
-        comments_text = ' '.join([c.get('body', '') for c in comments])
-        full_text = f"{summary} {description} {comments_text}"
+        # Un único join (sin texto intermedio de comentarios); descarta campos vacíos
+        full_text = ' '.join(filter(None, chain((summary, description), (c['body'] for c in comments))))
 
         timeline_entries = extract_timeline_entries(description)
 
@@ -617,6 +679,13 @@ def extract_ticket(jira: JIRA, issue_key: str) -> Optional[Dict[str, Any]]:
             affected_brands = []
 
         live_intervals = extract_live_intervals(comments)
+        # Todos los extractores trabajan sobre el texto en minúsculas: se calcula una vez
+        full_text_lower = full_text.lower()
+        if full_text_lower.strip():
+            hosts, technologies = extract_text_entities(full_text_lower)
+        else:
+            # Ticket sin texto: nada que escanear ni que guardar en la caché
+            hosts, technologies = [], []
 
         issue_data = {
             'assignee': {'name': safe_get(safe_get(fields, 'assignee'), 'name')},
@@ -636,7 +705,7 @@ def extract_ticket(jira: JIRA, issue_key: str) -> Optional[Dict[str, Any]]:
         first_impact = (
             normalize_datetime(get_custom_field_value(fields, 'first_impact_time')) or
             normalize_datetime(get_custom_field_value(fields, 'start_datetime')) or
-            extract_first_impact_time(description, timeline_entries)
+            extract_first_impact_time(timeline_entries)
         )
 
         normalized = {
@@ -653,9 +722,9 @@ def extract_ticket(jira: JIRA, issue_key: str) -> Optional[Dict[str, Any]]:
                 "live_intervals": live_intervals,
             },
             "entities": {
-                "services": extract_services(full_text, affected_bu),
-                "hosts": extract_hosts(full_text),
-                "technologies": extract_technologies(full_text),
+                "services": extract_services(full_text_lower, affected_bu, is_lower=True),
+                "hosts": hosts,
+                "technologies": technologies,
             },
             "organization": {
                 "team": get_custom_field_value(fields, 'responsible_entity'),
@@ -819,18 +888,25 @@ def search_teccm_in_window(
         )
 
         logger.info(f"Búsqueda 1 - TECCMs en ventana: {jql_window}")
-        issues_window = jira.search_issues(jql_window, maxResults=options.max_results)
-        window_keys = [issue.key for issue in issues_window]
-        all_teccm_keys.update(window_keys)
+        issues_window = jira.search_issues(jql_window, maxResults=options.max_results, fields='key')
+        window_keys = {issue.key for issue in issues_window}
+        all_teccm_keys |= window_keys
         search_stats["window"] = len(window_keys)
         logger.info(f"  → Encontrados {len(window_keys)} TECCMs en ventana")
 
+        # Las búsquedas 2 y 3 añaden condiciones a la de ventana, así que sus resultados
+        # son subconjuntos de ella: solo pueden aportar TECCMs nuevos si la búsqueda 1
+        # se cortó en max_results. Si no, se evitan dos peticiones a Jira.
+        window_truncated = len(window_keys) >= options.max_results
+
         # ══════════════════════════════════════════════════════════════════════
         # BÚSQUEDA 2: TECCMs activos al momento del incidente (opcional)
         # Añade constraint de ventana: solo TECCMs que empezaron en la ventana
         # Y estaban activos al momento del INC
         # ══════════════════════════════════════════════════════════════════════
-        if options.include_active:
+        if options.include_active and not window_truncated:
+            logger.info("Búsqueda 2 - TECCMs activos: incluidos en la búsqueda 1")
+        elif options.include_active:
             jql_active = (
                 f'project = {options.project} AND '
                 f'"Start Date/Time" >= "{start_str}" AND '
@@ -841,10 +917,10 @@ def search_teccm_in_window(
             )
 
             logger.info(f"Búsqueda 2 - TECCMs activos: {jql_active}")
-            issues_active = jira.search_issues(jql_active, maxResults=options.max_results)
-            active_keys = [issue.key for issue in issues_active]
-            new_from_active = [k for k in active_keys if k not in all_teccm_keys]
-            all_teccm_keys.update(active_keys)
+            issues_active = jira.search_issues(jql_active, maxResults=options.max_results, fields='key')
+            active_keys = {issue.key for issue in issues_active}
+            new_from_active = active_keys - all_teccm_keys
+            all_teccm_keys |= active_keys
             search_stats["active"] = len(new_from_active)
             logger.info(f"  → Encontrados {len(active_keys)} TECCMs activos ({len(new_from_active)} nuevos)")
         else:
@@ -855,7 +931,9 @@ def search_teccm_in_window(
         # Añade constraint de ventana: solo TECCMs que empezaron en la ventana
         # Y no tienen fecha de cierre
         # ══════════════════════════════════════════════════════════════════════
-        if options.include_no_end:
+        if options.include_no_end and not window_truncated:
+            logger.info("Búsqueda 3 - TECCMs sin fecha fin: incluidos en la búsqueda 1")
+        elif options.include_no_end:
             jql_no_end = (
                 f'project = {options.project} AND '
                 f'"Start Date/Time" >= "{start_str}" AND '
@@ -866,10 +944,10 @@ def search_teccm_in_window(
             )
 
             logger.info(f"Búsqueda 3 - TECCMs sin fecha fin: {jql_no_end}")
-            issues_no_end = jira.search_issues(jql_no_end, maxResults=options.max_results)
-            no_end_keys = [issue.key for issue in issues_no_end]
-            new_from_no_end = [k for k in no_end_keys if k not in all_teccm_keys]
-            all_teccm_keys.update(no_end_keys)
+            issues_no_end = jira.search_issues(jql_no_end, maxResults=options.max_results, fields='key')
+            no_end_keys = {issue.key for issue in issues_no_end}
+            new_from_no_end = no_end_keys - all_teccm_keys
+            all_teccm_keys |= no_end_keys
             search_stats["no_end"] = len(new_from_no_end)
             logger.info(f"  → Encontrados {len(no_end_keys)} TECCMs sin fecha fin ({len(new_from_no_end)} nuevos)")
         else:
@@ -1058,6 +1136,7 @@ def extract_inc_with_teccms(
         "inc_key": inc_key,
         "window": window_str,
         "threads_used": min(num_threads, max(1, len(teccm_keys))),
+        "ticket_counts": dict(Counter(t['ticket_type'] for t in results)),
     }
 
     # Añadir opciones avanzadas si se usaron
@@ -1210,6 +1289,7 @@ def extract_teccms_for_manual_analysis(
         "impact_time": impact_time.isoformat(),
         "window": window_str,
         "threads_used": min(num_threads, max(1, len(teccm_keys))),
+        "ticket_counts": dict(Counter(t['ticket_type'] for t in results)),
         "virtual_incident": {
             "name": virtual_incident.get("name"),
             "services": virtual_incident.get("services", []),
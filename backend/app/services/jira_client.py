@@ -3,10 +3,15 @@ Jira client wrapper.
 Maneja la conexión a Jira con las credenciales proporcionadas.
 """
 
+import hashlib
 import logging
-from typing import Optional, Tuple
+import secrets
+import threading
+import time
+from typing import Dict, Optional, Tuple
 from jira import JIRA
 from jira.exceptions import JIRAError
+from requests.adapters import HTTPAdapter
 
 from ..config import get_settings
 
@@ -32,6 +37,11 @@ class JiraClient:
                 server=self.url,
                 basic_auth=(self.username, self.password)
             )
+            # Keep-alive pool sized to the parallel extraction: with the requests
+            # default (10) extra threads open TLS connections and then discard them
+            adapter = HTTPAdapter(pool_maxsize=get_settings().extraction_threads)
+            self._client._session.mount("https://", adapter)
+            self._client._session.mount("http://", adapter)
             # Test connection by getting current user
             myself = self._client.myself()
             logger.info(f"Connected to Jira as {myself['displayName']}")
@@ -67,3 +77,82 @@ class JiraClient:
 def create_jira_client(username: str, password: str) -> JiraClient:
     """Factory function to create a JiraClient."""
     return JiraClient(username, password)
+
+
+# Connected clients shared across jobs, keyed by (url, username, keyed password hash).
+# Reusing them keeps the underlying HTTP session (keep-alive + TLS) warm. Entries
+# expire after CLIENT_TTL_SECONDS so credentials are re-validated against Jira,
+# and are dropped as soon as Jira answers 401/403.
+MAX_CLIENTS = 32
+CLIENT_TTL_SECONDS = 10 * 60
+
+_CLIENT_KEY_SALT = secrets.token_bytes(16)
+_clients: Dict[Tuple[str, str, str], Tuple[float, JiraClient]] = {}
+_clients_lock = threading.Lock()
+
+
+def _client_key(username: str, password: str) -> Tuple[str, str, str]:
+    digest = hashlib.blake2b(password.encode(), key=_CLIENT_KEY_SALT, digest_size=16).hexdigest()
+    return get_settings().jira_url, username, digest
+
+
+def _evict_clients() -> None:
+    """Drop expired clients, then the oldest ones, until there is room. Caller holds the lock."""
+    now = time.monotonic()
+    for key in [k for k, (exp, _) in _clients.items() if exp <= now]:
+        del _clients[key]
+    while len(_clients) >= MAX_CLIENTS:
+        del _clients[next(iter(_clients))]
+
+
+def _drop_client(key: Tuple[str, str, str]) -> None:
+    # Not closed here: a running job may still be using it.
+    with _clients_lock:
+        _clients.pop(key, None)
+
+
+def get_jira_client(username: str, password: str) -> JiraClient:
+    """
+    Devuelve un cliente conectado para estas credenciales, reutilizando el existente.
+    Raises: Exception si no se puede conectar.
+    """
+    key = _client_key(username, password)
+    with _clients_lock:
+        entry = _clients.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                return entry[1]
+            del _clients[key]
+
+    client = JiraClient(username, password)
+    success, message = client.connect()
+    if not success:
+        raise Exception(f"Failed to connect to Jira: {message}")
+
+    def _on_response(response, *args, **kwargs):
+        if response.status_code in (401, 403):
+            logger.info("Jira answered %s, dropping cached client for %s", response.status_code, username)
+            _drop_client(key)
+
+    client.client._session.hooks["response"].append(_on_response)
+
+    with _clients_lock:
+        entry = _clients.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        _clients.pop(key, None)
+        _evict_clients()
+        _clients[key] = (time.monotonic() + CLIENT_TTL_SECONDS, client)
+    return client
+
+
+def close_jira_clients():
+    """Close all shared clients (called on application shutdown)."""
+    with _clients_lock:
+        clients = [client for _, client in _clients.values()]
+        _clients.clear()
+    for client in clients:
+        try:
+            client.client.close()
+        except Exception:
+            pass
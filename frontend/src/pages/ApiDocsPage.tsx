@@ -132,6 +132,17 @@ const endpoints: Record<string, Endpoint[]> = {
   "teccm_count": 12,
   ...
 }`
+    },
+    {
+      method: 'GET',
+      path: '/api/analysis/jobs/{job_id}/stream',
+      description: 'Stream job progress as server-sent events (alternative to polling).',
+      auth: true,
+      response: `event: progress
+data: {"phase": "extracting", "progress": 45, "total": 30}
+
+event: done
+data: { "job_id": "uuid", "status": "completed", ... }`
     },
     {
       method: 'DELETE',